@@ -1,7 +1,7 @@
 # backend/accounts/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from .models import Classroom, ClassroomMembership, CustomUser
 
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
@@ -20,4 +20,18 @@ class CustomUserAdmin(UserAdmin):
         ('Informacje dodatkowe', {
             'fields': ('role', 'age', 'parent_email')
         }),
-    )
\ No newline at end of file
+    )
+
+
+class ClassroomMembershipInline(admin.TabularInline):
+    model = ClassroomMembership
+    raw_id_fields = ['student']
+    extra = 0
+
+
+@admin.register(Classroom)
+class ClassroomAdmin(admin.ModelAdmin):
+    list_display = ['name', 'teacher', 'created_at']
+    search_fields = ['name', 'teacher__username']
+    raw_id_fields = ['teacher']
+    inlines = [ClassroomMembershipInline]
@@ -0,0 +1,104 @@
+# backend/accounts/authentication.py
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import CustomUser
+
+# Pola stanu uwierzytelnienia trzymane w cache (bez haseł i danych profilu)
+AUTH_STATE_FIELDS = ('role', 'is_active', 'is_staff', 'is_superuser')
+
+# Cache procesu w kolejności zapisu, ograniczony do AUTH_USER_LOCAL_MAX_ENTRIES wpisów
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def auth_state_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def tokens_for_user(user):
+    """Tworzy parę tokenów z rolą w claimach (sprawdzenia uprawnień bez bazy)"""
+    refresh = RefreshToken.for_user(user)
+    refresh['role'] = user.role
+    return refresh
+
+
+def invalidate_auth_state(user_ids):
+    """Usuwa stan uwierzytelnienia z cache (lokalny wpis w innych procesach wygaśnie sam)"""
+    user_ids = [str(user_id) for user_id in user_ids]
+    cache.delete_many([auth_state_key(user_id) for user_id in user_ids])
+    with _local_lock:
+        for user_id in user_ids:
+            _local.pop(user_id, None)
+
+
+def get_auth_state(user_id):
+    """Zwraca rolę i flagi użytkownika: cache procesu → Redis → baza (jedno zapytanie)"""
+    user_id = str(user_id)
+    now = time.monotonic()
+    entry = _local.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    state = cache.get(auth_state_key(user_id))
+    if state is None:
+        state = CustomUser.objects.filter(pk=user_id).values(*AUTH_STATE_FIELDS).first()
+        if state is None:
+            return None
+        cache.set(auth_state_key(user_id), state, settings.AUTH_USER_CACHE_TTL)
+
+    with _local_lock:
+        _local[user_id] = (now + settings.AUTH_USER_LOCAL_TTL, state)
+        _local.move_to_end(user_id)
+        # Wpisy mają ten sam TTL, więc wygasłe są na początku kolejki
+        while _local and (len(_local) > settings.AUTH_USER_LOCAL_MAX_ENTRIES or next(iter(_local.values()))[0] <= now):
+            _local.popitem(last=False)
+    return state
+
+
+class TokenBackedUser(SimpleLazyObject):
+    """Użytkownik z tokenu: id, rola i flagi bez zapytania, pełny wiersz ładowany leniwie"""
+
+    def __init__(self, user_id, state):
+        super().__init__(lambda: CustomUser.objects.get(pk=user_id))
+        self.__dict__.update(
+            id=user_id,
+            pk=user_id,
+            is_authenticated=True,
+            is_anonymous=False,
+            **state
+        )
+
+    def __bool__(self):
+        # IsAuthenticated sprawdza bool(request.user) - bez ładowania wiersza
+        return True
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication rozwiązujące użytkownika z krótkotrwałego cache zamiast z bazy"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token nie zawiera identyfikatora użytkownika')
+
+        state = get_auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed('Nie znaleziono użytkownika', code='user_not_found')
+        if not state['is_active']:
+            raise AuthenticationFailed('Konto jest nieaktywne', code='user_inactive')
+
+        # Rola z tokenu musi zgadzać się z bieżącą - po zmianie roli token jest nieważny
+        role = validated_token.get('role', state['role'])
+        if role != state['role']:
+            raise AuthenticationFailed('Token wydany dla innej roli', code='role_changed')
+
+        return TokenBackedUser(CustomUser._meta.pk.to_python(user_id), state)
@@ -0,0 +1,122 @@
+# backend/accounts/avatars.py
+import io
+import os
+import uuid
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+from .models import CustomUser
+
+RENDITIONS_DIR = 'avatars/renditions'
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def stream_uploads_to_disk(request):
+    """Pliki z żądania trafiają od razu do pliku tymczasowego (bez buforowania w pamięci).
+
+    Trzeba wywołać przed pierwszym odczytem request.data.
+    """
+    django_request = getattr(request, '_request', request)
+    django_request.upload_handlers = [TemporaryFileUploadHandler(django_request)]
+
+
+def validate_avatar(upload):
+    """Sprawdza rozmiar i nagłówek obrazu bez dekodowania całej bitmapy"""
+    if upload.size > settings.AVATAR_MAX_UPLOAD_SIZE:
+        raise serializers.ValidationError(
+            {'avatar': f'Maksymalny rozmiar pliku to {settings.AVATAR_MAX_UPLOAD_SIZE // (1024 * 1024)} MB'}
+        )
+    try:
+        with Image.open(upload) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise serializers.ValidationError({'avatar': 'Plik nie jest poprawnym obrazem'})
+    upload.seek(0)
+
+
+def store_avatar(user, upload):
+    """Zapisuje oryginał i zleca wygenerowanie miniatur po zatwierdzeniu transakcji.
+
+    Plik tymczasowy jest przenoszony do MEDIA_ROOT (FileSystemStorage robi
+    rename zamiast kopiowania), a w bazie aktualizowane są tylko kolumny awatara.
+    """
+    validate_avatar(upload)
+    extension = os.path.splitext(upload.name)[1].lower() or '.jpg'
+    field = CustomUser._meta.get_field('avatar')
+    name = field.storage.save(
+        field.generate_filename(user, f'{user.pk}-{uuid.uuid4().hex[:8]}{extension}'),
+        upload
+    )
+
+    previous = CustomUser.objects.filter(pk=user.pk).values_list('avatar', flat=True).first()
+    CustomUser.objects.filter(pk=user.pk).update(avatar=name, avatar_renditions={})
+
+    from .tasks import generate_avatar_renditions
+
+    transaction.on_commit(lambda: generate_avatar_renditions.delay(str(user.pk), name))
+    if previous:
+        transaction.on_commit(lambda: field.storage.delete(previous))
+    return name
+
+
+def rendition_name(user_id, source, size, extension):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f'{RENDITIONS_DIR}/{user_id}/{stem}_{size}.{extension}'
+
+
+def build_renditions(user_id, source):
+    """Generuje kwadratowe miniatury WebP i JPEG we wszystkich rozmiarach z AVATAR_SIZES"""
+    with default_storage.open(source, 'rb') as original, Image.open(original) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        renditions = {}
+        for size in sorted(settings.AVATAR_SIZES, reverse=True):
+            thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            renditions[str(size)] = {}
+            for extension, options in FORMATS.items():
+                frame = thumbnail
+                if options['format'] == 'JPEG' and frame.mode != 'RGB':
+                    # JPEG nie ma kanału alfa - przezroczystość na białym tle
+                    background = Image.new('RGB', frame.size, (255, 255, 255))
+                    background.paste(frame, mask=frame.getchannel('A'))
+                    frame = background
+                buffer = io.BytesIO()
+                frame.save(buffer, **options)
+                name = rendition_name(user_id, source, size, extension)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                renditions[str(size)][extension] = default_storage.save(name, ContentFile(buffer.getvalue()))
+    return renditions
+
+
+def remove_stale_renditions(user_id, keep):
+    """Usuwa miniatury poprzednich awatarów użytkownika"""
+    directory = f'{RENDITIONS_DIR}/{user_id}'
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        name = f'{directory}/{filename}'
+        if name not in keep:
+            default_storage.delete(name)
+
+
+def avatar_urls(user, request=None):
+    """Adresy miniatur: {rozmiar: {'webp': url, 'jpeg': url}} (puste, dopóki zadanie ich nie utworzy)"""
+    urls = {}
+    for size, formats in (user.avatar_renditions or {}).items():
+        urls[size] = {}
+        for extension, name in formats.items():
+            url = default_storage.url(name)
+            urls[size][extension] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,24 @@
+# backend/accounts/blacklist.py
+import time
+from config.redis import get_redis
+
+KEY_PREFIX = 'auth:blacklist'
+
+
+def blacklist_key(jti):
+    return f'{KEY_PREFIX}:{jti}'
+
+
+def blacklist_token(token):
+    """Unieważnia token (po jti) do końca jego ważności.
+
+    SET NX jest atomowe: zwraca True tylko pierwszemu wywołaniu, więc
+    dwa równoległe odświeżenia tym samym tokenem nie dostaną dwóch nowych
+    par. Klucz wygasa razem z tokenem - magazyn nie rośnie.
+    """
+    ttl = max(int(token['exp'] - time.time()), 1)
+    return bool(get_redis().set(blacklist_key(token['jti']), 1, nx=True, ex=ttl))
+
+
+def is_blacklisted(token):
+    return bool(get_redis().exists(blacklist_key(token['jti'])))
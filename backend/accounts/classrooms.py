@@ -0,0 +1,58 @@
+# backend/accounts/classrooms.py
+from django.db.models import Avg, Count, IntegerField, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from .models import ClassroomMembership, CustomUser
+
+
+def class_dashboard(classroom):
+    """Postępy wszystkich uczniów klasy jednym zapytaniem grupującym.
+
+    Ukończenia i średnia liczone są z Progress (JOIN po indeksie user_id),
+    ostatnia aktywność to podzapytanie top-1 po indeksie (user, -created_at)
+    dziennika aktywności, a liczba aktywnych lekcji - skalarne podzapytanie.
+    Liczba zapytań nie zależy od liczby uczniów.
+    """
+    from api.models import ActivityLog, Lesson
+
+    # Tylko aktywne lekcje - tak jak w mianowniku, inaczej odsetek mógłby przekroczyć 100%
+    completed = Q(progress__completed=True, progress__lesson__is_active=True)
+    last_activity = ActivityLog.objects.filter(
+        user=OuterRef('pk')
+    ).order_by('-created_at').values('created_at')[:1]
+    active_lessons = Lesson.objects.filter(
+        is_active=True
+    ).order_by().values('is_active').annotate(total=Count('id')).values('total')
+
+    rows = CustomUser.objects.filter(
+        id__in=ClassroomMembership.objects.filter(classroom=classroom).values('student_id')
+    ).annotate(
+        completed_lessons=Count('progress', filter=completed),
+        average_score=Avg('progress__score', filter=completed),
+        last_completed_at=Max('progress__completed_at', filter=completed),
+        last_activity=Subquery(last_activity),
+        total_lessons=Coalesce(Subquery(active_lessons, output_field=IntegerField()), 0),
+    ).values(
+        'id', 'username', 'first_name', 'last_name', 'points', 'level',
+        'completed_lessons', 'average_score', 'last_completed_at', 'last_activity', 'total_lessons',
+    ).order_by('last_name', 'first_name', 'username')
+
+    students = []
+    for row in rows:
+        total = row.pop('total_lessons')
+        students.append(dict(
+            row,
+            average_score=round(row['average_score'] or 0, 2),
+            completion_rate=round(row['completed_lessons'] / total * 100, 2) if total else 0,
+        ))
+
+    count = len(students)
+    return {
+        'classroom': {'id': classroom.id, 'name': classroom.name},
+        'summary': {
+            'students': count,
+            'average_completion_rate': round(sum(s['completion_rate'] for s in students) / count, 2) if count else 0,
+            'average_score': round(sum(s['average_score'] for s in students) / count, 2) if count else 0,
+            'total_points': sum(s['points'] for s in students),
+        },
+        'students': students,
+    }
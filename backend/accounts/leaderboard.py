@@ -0,0 +1,193 @@
+# backend/accounts/leaderboard.py
+import logging
+import uuid
+from collections import defaultdict
+import redis
+from config.redis import get_redis
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'leaderboard'
+# Uczniowie zmienieni od początku ostatniej odbudowy - po podmianie tablic zapisywani ponownie
+TOUCHED_KEY = f'{KEY_PREFIX}:touched'
+TOUCHED_TTL = 2 * 24 * 60 * 60
+
+# Grupy wiekowe uczniów (wiek 5-18, zob. walidatory CustomUser.age)
+AGE_GROUPS = (
+    ('5-8', 5, 8),
+    ('9-12', 9, 12),
+    ('13-15', 13, 15),
+    ('16-18', 16, 18),
+)
+
+
+def global_key():
+    return f'{KEY_PREFIX}:global'
+
+
+def level_key(level):
+    return f'{KEY_PREFIX}:level:{level}'
+
+
+def age_group(age):
+    if age is None:
+        return None
+    for name, low, high in AGE_GROUPS:
+        if low <= age <= high:
+            return name
+    return None
+
+
+def age_key(group):
+    return f'{KEY_PREFIX}:age:{group}'
+
+
+def board_keys(level, age):
+    """Zwraca klucze wszystkich tablic, na których występuje uczeń"""
+    keys = [global_key(), level_key(level)]
+    group = age_group(age)
+    if group:
+        keys.append(age_key(group))
+    return keys
+
+
+def update_users(rows):
+    """Zapisuje wyniki uczniów na ich tablicach jednym pipeline'em (O(log n) na tablicę).
+
+    rows to krotki (id, punkty, poziom, wiek, poprzedni poziom).
+    """
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for user_id, points, level, age, previous_level in rows:
+            if previous_level is not None and previous_level != level:
+                pipe.zrem(level_key(previous_level), str(user_id))
+            for key in board_keys(level, age):
+                pipe.zadd(key, {str(user_id): points})
+        if rows:
+            pipe.sadd(TOUCHED_KEY, *[str(row[0]) for row in rows])
+            pipe.expire(TOUCHED_KEY, TOUCHED_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        # Tablice odbuduje rebuild_leaderboards - brak Redis nie blokuje przyznania punktów
+        logger.warning(f"Nie udało się zaktualizować rankingu ({len(rows)} uczniów): {e}")
+
+
+def _entries(rows, first_rank):
+    """Uzupełnia (id, punkty) z Redis o nazwy użytkowników jednym zapytaniem po PK"""
+    ids = [uuid.UUID(member.decode()) for member, _ in rows]
+    users = CustomUser.objects.only('id', 'username', 'level').in_bulk(ids)
+    result = []
+    for offset, (user_id, (_, score)) in enumerate(zip(ids, rows)):
+        user = users.get(user_id)
+        if user is None:
+            continue
+        result.append({
+            'rank': first_rank + offset,
+            'user_id': str(user.id),
+            'username': user.username,
+            'points': int(score),
+            'level': user.level,
+        })
+    return result
+
+
+def top(key, limit=10):
+    """Pierwsze `limit` miejsc tablicy"""
+    rows = get_redis().zrevrange(key, 0, limit - 1, withscores=True)
+    return _entries(rows, 1)
+
+
+def rank(key, user_id):
+    """Miejsce (od 1) i punkty użytkownika albo None, gdy nie ma go na tablicy"""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.zrevrank(key, str(user_id))
+    pipe.zscore(key, str(user_id))
+    position, score = pipe.execute()
+    if position is None:
+        return None
+    return {'rank': position + 1, 'points': int(score)}
+
+
+def around(key, user_id, radius=5):
+    """Sąsiedzi użytkownika na tablicy: `radius` miejsc wyżej i niżej"""
+    position = get_redis().zrevrank(key, str(user_id))
+    if position is None:
+        return []
+    start = max(position - radius, 0)
+    rows = get_redis().zrevrange(key, start, position + radius, withscores=True)
+    return _entries(rows, start + 1)
+
+
+def rebuild(batch_size=5000):
+    """Odbudowuje wszystkie tablice z bazy.
+
+    Uczniowie są czytani strumieniowo i zapisywani do kluczy tymczasowych
+    pipeline'ami po `batch_size` uczniów (jedno ZADD na tablicę); na końcu klucze tymczasowe
+    zastępują bieżące jednym MULTI (RENAME), więc odczyty nie widzą
+    częściowo zbudowanych tablic. Uczniów, którym update_users zmienił wynik
+    w trakcie odbudowy (zbiór TOUCHED_KEY), RENAME by cofnął - po podmianie
+    są zapisywani ponownie z bieżącego stanu bazy.
+    """
+    client = get_redis()
+    suffix = ':rebuild'
+    built = set()
+    students = CustomUser.objects.filter(
+        role='student', is_active=True
+    ).values_list('id', 'points', 'level', 'age').order_by().iterator(chunk_size=batch_size)
+
+    leftovers = list(client.scan_iter(f'{KEY_PREFIX}:*{suffix}'))
+    client.delete(TOUCHED_KEY, *leftovers)
+
+    def flush(batch):
+        pipe = client.pipeline(transaction=False)
+        for key, members in batch.items():
+            pipe.zadd(key + suffix, members)
+        pipe.execute()
+
+    count = 0
+    batch = defaultdict(dict)
+    for user_id, points, level, age in students:
+        for key in board_keys(level, age):
+            batch[key][str(user_id)] = points
+            built.add(key)
+        count += 1
+        if count % batch_size == 0:
+            flush(batch)
+            batch = defaultdict(dict)
+    flush(batch)
+
+    stale = {
+        key.decode() for key in client.scan_iter(f'{KEY_PREFIX}:*')
+        if not key.decode().endswith(suffix)
+    } - built - {TOUCHED_KEY}
+
+    swap = client.pipeline(transaction=True)
+    for key in built:
+        swap.rename(key + suffix, key)
+    for key in stale:
+        swap.delete(key)
+    swap.smembers(TOUCHED_KEY)
+    swap.delete(TOUCHED_KEY)
+    touched = swap.execute()[-2]
+    if touched:
+        _reapply(client, touched, built)
+
+    logger.info(f"Odbudowano {len(built)} tablic rankingu ({count} uczniów, {len(touched)} zmienionych w trakcie)")
+    return {'students': count, 'boards': len(built), 'removed': len(stale), 'reapplied': len(touched)}
+
+
+def _reapply(client, members, boards):
+    """Zapisuje uczniów z bieżącego stanu bazy, usuwając ich wcześniej ze wszystkich tablic odbudowy"""
+    ids = [uuid.UUID(member.decode()) for member in members]
+    rows = CustomUser.objects.filter(
+        id__in=ids, role='student', is_active=True
+    ).values_list('id', 'points', 'level', 'age')
+    pipe = client.pipeline(transaction=True)
+    for user_id in ids:
+        for key in boards:
+            pipe.zrem(key, str(user_id))
+    for user_id, points, level, age in rows:
+        for key in board_keys(level, age):
+            pipe.zadd(key, {str(user_id): points})
+    pipe.execute()
@@ -0,0 +1,61 @@
+# backend/accounts/management/commands/benchmark_auth.py
+# Uruchomienie: python manage.py benchmark_auth --requests 500 --url /api/auth/users/stats/
+
+import random
+import statistics
+import time
+from unittest import mock
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import CachedJWTAuthentication, tokens_for_user
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Porównuje liczbę zapytań i opóźnienie żądań z JWTAuthentication i CachedJWTAuthentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Liczba żądań na wariant')
+        parser.add_argument('--url', default='/api/auth/users/stats/', help='Mierzony endpoint (GET)')
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.create_user(
+            username=f'bench_{random.randint(0, 10 ** 9)}', password='bench'
+        )
+        try:
+            token = str(tokens_for_user(user).access_token)
+            for label, auth_class in (
+                ('JWTAuthentication', JWTAuthentication),
+                ('CachedJWTAuthentication', CachedJWTAuthentication),
+            ):
+                self.run(label, auth_class, token, options['url'], options['requests'])
+        finally:
+            user.delete()
+
+    def run(self, label, auth_class, token, url, count):
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_HOST=host)
+        latencies = []
+        queries = []
+        # Widoki dziedziczą authentication_classes z APIView
+        with mock.patch.object(APIView, 'authentication_classes', [auth_class]):
+            client.get(url)  # rozgrzanie cache
+            for _ in range(count):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append(time.perf_counter() - start)
+                queries.append(len(ctx.captured_queries))
+
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f'{label:<26} HTTP {response.status_code}  '
+            f'{statistics.mean(queries):.2f} zapytań/żądanie  '
+            f'p50 {statistics.median(latencies) * 1000:.2f} ms  p99 {p99 * 1000:.2f} ms'
+        )
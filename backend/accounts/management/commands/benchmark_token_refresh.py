@@ -0,0 +1,81 @@
+# backend/accounts/management/commands/benchmark_token_refresh.py
+# Uruchomienie: python manage.py benchmark_token_refresh --refreshes 1000 --replay-threads 16
+
+import random
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.authentication import tokens_for_user
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Mierzy liczbę odświeżeń tokenu na sekundę i sprawdza odrzucanie zużytych tokenów'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refreshes', type=int, default=1000, help='Liczba kolejnych odświeżeń')
+        parser.add_argument('--replay-threads', type=int, default=16, help='Wątki odświeżające ten sam token')
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.create_user(
+            username=f'bench_{random.randint(0, 10 ** 9)}', password='bench'
+        )
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        self.client = Client(HTTP_HOST=host)
+        self.url = reverse('token_refresh')
+        try:
+            self.chain(user, options['refreshes'])
+            self.replay(user, options['replay_threads'])
+        finally:
+            user.delete()
+
+    def refresh(self, token, client=None):
+        return (client or self.client).post(self.url, {'refresh': token}, content_type='application/json')
+
+    def chain(self, user, count):
+        token = str(tokens_for_user(user))
+        self.refresh(str(tokens_for_user(user)))  # rozgrzanie cache stanu konta
+
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.refresh(token)
+            queries += len(ctx.captured_queries)
+            if response.status_code != 200:
+                raise CommandError(f'Odświeżenie nie powiodło się: {response.content[:200]}')
+            token = response.json()['refresh']
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{count} odświeżeń w {elapsed:.2f}s ({count / elapsed:.0f}/s, '
+            f'{queries / count:.2f} zapytań SQL na odświeżenie)'
+        )
+
+    def replay(self, user, threads):
+        token = str(tokens_for_user(user))
+        barrier = threading.Barrier(threads)
+        statuses = []
+
+        def worker():
+            client = Client(HTTP_HOST=self.client.defaults['HTTP_HOST'])
+            barrier.wait()
+            statuses.append(self.refresh(token, client).status_code)
+            connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        accepted = statuses.count(200)
+        if accepted != 1:
+            raise CommandError(f'Ten sam token odświeżono {accepted} razy (oczekiwano 1)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ten sam token wysłany z {threads} wątków: 1 odświeżenie, {threads - 1} odrzuconych'
+        ))
@@ -0,0 +1,78 @@
+# backend/accounts/management/commands/import_roster.py
+# Uruchomienie: python manage.py import_roster klasa_3a.csv [--workers 8] [--classroom <id>]
+#               python manage.py import_roster --generate 10000 --dry-run
+
+import json
+import random
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from accounts.models import Classroom
+from accounts.provisioning import parse_roster, provision_students
+
+
+class Command(BaseCommand):
+    help = 'Zakłada konta uczniów z listy klasy (CSV/JSON) i raportuje tempo importu'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Plik CSV lub JSON z listą uczniów')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Format pliku (domyślnie z zawartości)')
+        parser.add_argument('--workers', type=int, help='Liczba procesów hashujących hasła')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Liczba kont w jednym bulk_create')
+        parser.add_argument('--generate', type=int, help='Zamiast pliku generuje N losowych uczniów')
+        parser.add_argument('--dry-run', action='store_true', help='Wycofuje utworzone konta na końcu')
+        parser.add_argument('--classroom', help='Id klasy, do której zostaną zapisani uczniowie')
+
+    def handle(self, *args, **options):
+        if options['generate']:
+            rows = self.generate(options['generate'])
+        elif options['path']:
+            try:
+                with open(options['path'], 'rb') as roster:
+                    rows = parse_roster(roster.read(), options['format'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Nie można wczytać listy: {e}')
+        else:
+            raise CommandError('Podaj plik z listą uczniów albo --generate N')
+
+        classroom = None
+        if options['classroom']:
+            classroom = Classroom.objects.filter(pk=options['classroom']).first()
+            if classroom is None:
+                raise CommandError('Nie znaleziono klasy')
+
+        with transaction.atomic():
+            report = provision_students(
+                rows, workers=options['workers'], chunk_size=options['chunk_size'], classroom=classroom,
+                provisioned_by=classroom.teacher_id if classroom else None
+            )
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        for error in report['errors'][:20]:
+            self.stdout.write(self.style.WARNING(
+                f"wiersz {error['row']} ({error.get('username')}): {json.dumps(error['errors'], ensure_ascii=False)}"
+            ))
+        if report['failed'] > 20:
+            self.stdout.write(self.style.WARNING(f"... i {report['failed'] - 20} kolejnych błędów"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Utworzono {report['created']} kont ({report['failed']} błędnych wierszy) "
+            f"w {report['duration']:.2f}s - {report['users_per_sec']:.0f} użytkowników/s"
+        ))
+        if options['dry_run']:
+            self.stdout.write('Konta wycofane (--dry-run).')
+        elif report['generated_passwords'] and not options['generate']:
+            self.stdout.write(json.dumps(report['generated_passwords'], ensure_ascii=False, indent=2))
+
+    def generate(self, count):
+        prefix = f'uczen{random.randint(0, 10 ** 6)}'
+        return [
+            {
+                'username': f'{prefix}_{i}',
+                'first_name': f'Uczeń {i}',
+                'password': f'Haslo-{random.getrandbits(48):x}',
+                'age': random.randint(7, 15),
+                'parent_email': f'rodzic{i}@example.com',
+            }
+            for i in range(count)
+        ]
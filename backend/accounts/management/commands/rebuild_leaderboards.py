@@ -0,0 +1,27 @@
+# backend/accounts/management/commands/rebuild_leaderboards.py
+# Uruchomienie: python manage.py rebuild_leaderboards [--batch-size 5000]
+
+import time
+from django.core.management.base import BaseCommand
+from accounts.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Odbudowuje rankingi uczniów (Redis) na podstawie punktów w bazie'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Liczba uczniów zapisywanych jednym pipeline\'em'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = rebuild(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Odbudowano {result['boards']} tablic dla {result['students']} uczniów "
+            f"w {elapsed:.2f}s (usunięto {result['removed']} nieaktualnych tablic)"
+        ))
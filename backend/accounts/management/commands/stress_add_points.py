@@ -0,0 +1,93 @@
+# backend/accounts/management/commands/stress_add_points.py
+# Uruchomienie: python manage.py stress_add_points --threads 16 --awards 100 [--legacy]
+# Test regresji: accounts/tests.py (pytest); ta komenda to opcjonalny pomiar przepustowości
+
+import random
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from accounts.leaderboard import board_keys
+from accounts.models import POINTS_PER_LEVEL, CustomUser
+from config.redis import get_redis
+from analytics.models import UserProgress
+
+
+def legacy_add_points(user, points):
+    """Poprzednia implementacja: odczyt-modyfikacja-zapis całego wiersza"""
+    user.points += points
+    new_level = (user.points // POINTS_PER_LEVEL) + 1
+    if new_level > user.level:
+        user.level = new_level
+    user.save()
+
+
+class Command(BaseCommand):
+    help = 'Przyznaje punkty jednemu uczniowi z wielu wątków i sprawdza, czy żadne się nie zgubiły'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Liczba równoległych wątków')
+        parser.add_argument('--awards', type=int, default=100, help='Liczba przyznań na wątek')
+        parser.add_argument('--points', type=int, default=7, help='Punkty w jednym przyznaniu')
+        parser.add_argument('--legacy', action='store_true', help='Dla porównania uruchamia też starą wersję')
+
+    def handle(self, *args, **options):
+        if options['legacy']:
+            self.run('stara wersja (save)', options, legacy=True)
+        self.run('UPDATE ... RETURNING', options, legacy=False, strict=True)
+
+    def run(self, label, options, legacy, strict=False):
+        user = CustomUser.objects.create_user(
+            username=f'stress_{random.randint(0, 10 ** 9)}', password='stress'
+        )
+        points = options['points']
+        barrier = threading.Barrier(options['threads'])
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(options['awards']):
+                    if legacy:
+                        legacy_add_points(CustomUser.objects.get(pk=user.pk), points)
+                    else:
+                        CustomUser.objects.get(pk=user.pk).add_points(points)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        try:
+            if errors:
+                raise CommandError(f'{label}: błąd przyznania punktów: {errors[0]}')
+
+            awards = options['threads'] * options['awards']
+            expected = awards * points
+            user.refresh_from_db()
+            lost = expected - user.points
+            self.stdout.write(
+                f'{label}: {awards} przyznań w {elapsed:.2f}s ({awards / elapsed:.0f}/s), '
+                f'punkty {user.points}/{expected}, zgubiono {lost}'
+            )
+            if not strict:
+                return
+
+            summary = UserProgress.objects.filter(user=user).first()
+            expected_level = expected // POINTS_PER_LEVEL + 1
+            if lost or user.level != expected_level:
+                raise CommandError(f'{label}: zgubione aktualizacje (poziom {user.level}, oczekiwano {expected_level})')
+            if summary is None or summary.points_earned != expected or summary.level != expected_level:
+                raise CommandError(f'{label}: podsumowanie UserProgress niezgodne z punktami użytkownika')
+            self.stdout.write(self.style.SUCCESS(f'{label}: brak zgubionych punktów, poziom {user.level}'))
+        finally:
+            user.delete()
+            for key in board_keys(user.level, user.age):
+                get_redis().zrem(key, str(user.id))
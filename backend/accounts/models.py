@@ -1,9 +1,97 @@
 # backend/accounts/models.py
-from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db import connection, models, transaction
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
+POINTS_PER_LEVEL = 100
+
+
+class CustomUserManager(UserManager):
+    def students_of(self, teacher):
+        """Uczniowie z klas prowadzonych przez nauczyciela (podzapytanie zamiast DISTINCT)"""
+        student_ids = ClassroomMembership.objects.filter(
+            classroom__teacher_id=teacher.id
+        ).values('student_id')
+        return self.filter(role='student', id__in=student_ids)
+
+    def award_points(self, user_ids, points):
+        """Przyznaje punkty użytkownikom (np. całej klasie) jednym zapytaniem.
+
+        Po zapisie aktualizuje podsumowania UserProgress i - po zatwierdzeniu
+        transakcji - rankingi uczniów. Zwraca listę krotek
+        (id, punkty, poziom, poprzedni poziom, rola, wiek).
+        """
+        from .signals import points_awarded
+
+        # Blokady wierszy users obejmują też aktualizację podsumowań w odbiornikach sygnału
+        # (bez savepointu - wewnątrz większej transakcji to dwa zapytania mniej)
+        with transaction.atomic(savepoint=False):
+            awarded = self._increment_points(user_ids, points)
+            if not awarded:
+                return awarded
+            points_awarded.send(sender=self.model, user_ids=[row[0] for row in awarded], points=points)
+
+        students = [
+            (user_id, total, level, age, previous_level)
+            for user_id, total, level, previous_level, role, age in awarded
+            if role == 'student'
+        ]
+        if students:
+            from .leaderboard import update_users
+            transaction.on_commit(lambda: update_users(students))
+        return awarded
+
+    def _increment_points(self, user_ids, points):
+        """Dodaje punkty i przelicza poziom jednym UPDATE ... RETURNING.
+
+        Przyrost i poziom liczone są w SQL, więc równoległe przyznania się nie
+        gubią, a zapis dotyka tylko kolumn points i level.
+        """
+        user_ids = sorted({str(user_id) for user_id in user_ids})
+        if not user_ids:
+            return []
+        table = self.model._meta.db_table
+        id_field = self.model._meta.pk
+        ids = [id_field.get_db_prep_value(user_id, connection) for user_id in user_ids]
+
+        if connection.vendor == 'postgresql':
+            # Podzapytanie FOR UPDATE blokuje wiersze w stałej kolejności i daje poprzedni poziom
+            sql = f'''
+                UPDATE {table} AS u SET
+                    points = u.points + %s,
+                    level = GREATEST(u.level, (u.points + %s) / {POINTS_PER_LEVEL} + 1)
+                FROM (
+                    SELECT id, level FROM {table} WHERE id = ANY(%s) ORDER BY id FOR UPDATE
+                ) AS old
+                WHERE u.id = old.id
+                RETURNING u.id, u.points, u.level, old.level, u.role, u.age
+            '''
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [points, points, ids])
+                return cursor.fetchall()
+
+        # Pozostałe bazy (SQLite w środowisku deweloperskim) serializują zapisy
+        placeholders = ', '.join(['%s'] * len(ids))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'SELECT id, level FROM {table} WHERE id IN ({placeholders})', ids)
+            previous = dict(cursor.fetchall())
+            cursor.execute(
+                f'''
+                UPDATE {table} SET
+                    points = points + %s,
+                    level = MAX(level, (points + %s) / {POINTS_PER_LEVEL} + 1)
+                WHERE id IN ({placeholders})
+                RETURNING id, points, level, role, age
+                ''',
+                [points, points, *ids]
+            )
+            return [
+                (id_field.to_python(user_id), total, level, previous[user_id], role, age)
+                for user_id, total, level, role, age in cursor.fetchall()
+            ]
+
+
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
         ('student', 'Uczeń'),
@@ -23,25 +111,78 @@ class CustomUser(AbstractUser):
     level = models.IntegerField(default=1)
     two_factor_enabled = models.BooleanField(default=False)
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    # Miniatury awatara generowane w tle: {"64": {"webp": "...", "jpeg": "..."}}
+    avatar_renditions = models.JSONField(default=dict, blank=True)
     parent_email = models.EmailField(blank=True, null=True)
+    # Nauczyciel, który założył konto z listy klasy - tylko on może zapisać ucznia do swoich klas
+    provisioned_by = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='provisioned_students'
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CustomUserManager()
+
     class Meta:
         db_table = 'users'
         verbose_name = 'Użytkownik'
         verbose_name_plural = 'Użytkownicy'
+        indexes = [
+            # Klucze stronicowania list użytkowników (KeysetPagination)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['role', 'created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
     def add_points(self, points):
         """Dodaje punkty i sprawdza awans poziomu"""
-        self.points += points
-        new_level = (self.points // 100) + 1
-        if new_level > self.level:
-            self.level = new_level
-        self.save()
+        awarded = CustomUser.objects.award_points([self.id], points)
+        if not awarded:
+            raise CustomUser.DoesNotExist(f'Użytkownik {self.id} nie istnieje')
+        [(_, self.points, self.level, _, _, _)] = awarded
         return self.level
 
+
+class Classroom(models.Model):
+    """Klasa prowadzona przez nauczyciela"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    teacher = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='classrooms')
+    students = models.ManyToManyField(
+        CustomUser,
+        through='ClassroomMembership',
+        related_name='enrolled_classrooms'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'classrooms'
+        verbose_name = 'Klasa'
+        verbose_name_plural = 'Klasy'
+
+    def __str__(self):
+        return f"{self.name} ({self.teacher.username})"
+
+
+class ClassroomMembership(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name='memberships')
+    student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='memberships')
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'classroom_memberships'
+        verbose_name = 'Uczeń w klasie'
+        verbose_name_plural = 'Uczniowie w klasach'
+        # Unikalność (classroom, student) daje indeks pod listę klasy,
+        # a (student, classroom) - pod zawężanie widoków nauczyciela
+        unique_together = ('classroom', 'student')
+        indexes = [
+            models.Index(fields=['student', 'classroom']),
+        ]
+
+    def __str__(self):
+        return f"{self.classroom.name} - {self.student.username}"
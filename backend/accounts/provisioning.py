@@ -0,0 +1,258 @@
+# backend/accounts/provisioning.py
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+from .models import Classroom, ClassroomMembership, CustomUser
+
+logger = logging.getLogger(__name__)
+
+# Poniżej tej liczby haseł uruchamianie puli procesów się nie opłaca
+POOL_THRESHOLD = 50
+
+
+class RosterRowSerializer(serializers.Serializer):
+    """Jeden uczeń z listy klasy"""
+    username = serializers.RegexField(r'^[\w.@+-]+\Z', max_length=150)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    password = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    first_name = serializers.CharField(required=False, allow_blank=True, max_length=150)
+    last_name = serializers.CharField(required=False, allow_blank=True, max_length=150)
+    age = serializers.IntegerField(required=False, allow_null=True, min_value=5, max_value=18)
+    parent_email = serializers.EmailField()
+
+
+def parse_roster(content, fmt=None):
+    """Zamienia plik CSV (nagłówek w pierwszym wierszu) lub JSON (lista obiektów) na listę słowników"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if fmt is None:
+        fmt = 'json' if content.lstrip().startswith(('[', '{')) else 'csv'
+
+    if fmt == 'json':
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get('students', [])
+        if not isinstance(data, list):
+            raise ValueError('Oczekiwano listy uczniów')
+        return data
+
+    rows = []
+    for row in csv.DictReader(io.StringIO(content)):
+        # Puste komórki CSV traktujemy jak brak wartości
+        rows.append({key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()})
+    return rows
+
+
+def hash_passwords(passwords, workers=None):
+    """Hashuje hasła równolegle w puli procesów (PBKDF2 jest ograniczone przez CPU).
+
+    Pula żyje tylko na czas wywołania - duże listy hashuje zadanie Celery,
+    więc procesy obsługujące żądania nie trzymają własnych pul. Kontekst
+    spawn: procesy startują od zera zamiast kopii procesu wywołującego (bez
+    jego połączeń z bazą i Redis oraz wątków w tle).
+    """
+    workers = workers or settings.PROVISIONING_WORKERS or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < POOL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+
+    workers = min(workers, len(passwords) // POOL_THRESHOLD + 1)
+    chunksize = max(1, len(passwords) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            # Nie funkcja z tego modułu: jego import w nowym procesie wymaga gotowych modeli
+            initializer=django.setup
+        ) as pool:
+            return list(pool.map(make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.error("Pula procesów hashujących przestała działać - hashowanie w bieżącym procesie")
+        return [make_password(password) for password in passwords]
+
+
+def validate_rows(rows):
+    """Waliduje wiersze; zwraca (poprawne, błędy) bez przerywania na pierwszym błędzie"""
+    valid, errors = [], []
+    seen = set()
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ['Oczekiwano obiektu']}})
+            continue
+        serializer = RosterRowSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'row': index, 'username': row.get('username'), 'errors': serializer.errors})
+            continue
+
+        data = dict(serializer.validated_data)
+        username = data['username']
+        if username.lower() in seen:
+            errors.append({'row': index, 'username': username, 'errors': {'username': ['Powtórzona nazwa w pliku']}})
+            continue
+
+        generated = not data.get('password')
+        if generated:
+            data['password'] = secrets.token_urlsafe(9)
+        else:
+            try:
+                validate_password(data['password'], CustomUser(username=username, email=data.get('email', '')))
+            except ValidationError as e:
+                errors.append({'row': index, 'username': username, 'errors': {'password': list(e.messages)}})
+                continue
+
+        seen.add(username.lower())
+        valid.append((index, data, generated))
+
+    # Jedno zapytanie o nazwy zajęte w bazie - bez rozróżniania wielkości liter, jak w pliku
+    taken = set(CustomUser.objects.annotate(username_lower=Lower('username')).filter(
+        username_lower__in=[data['username'].lower() for _, data, _ in valid]
+    ).values_list('username_lower', flat=True))
+    if taken:
+        for index, data, _ in valid:
+            if data['username'].lower() in taken:
+                errors.append({'row': index, 'username': data['username'], 'errors': {'username': ['Nazwa jest już zajęta']}})
+        valid = [item for item in valid if item[1]['username'].lower() not in taken]
+    return valid, errors
+
+
+def _insert(chunk, errors):
+    """Wstawia porcję jednym bulk_create; przy konflikcie wiersz po wierszu (savepointy).
+
+    Zwraca utworzonych użytkowników.
+    """
+    try:
+        with transaction.atomic():
+            CustomUser.objects.bulk_create([user for _, user in chunk])
+        return [user for _, user in chunk]
+    except IntegrityError:
+        created = []
+        for index, user in chunk:
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                created.append(user)
+            except IntegrityError:
+                errors.append({'row': index, 'username': user.username, 'errors': {'username': ['Nazwa jest już zajęta']}})
+        return created
+
+
+def provision_students(rows, workers=None, chunk_size=1000, classroom=None, provisioned_by=None):
+    """Tworzy konta uczniów z listy klasy.
+
+    Błędne wiersze trafiają do raportu i nie przerywają importu. Hasła są
+    hashowane w puli procesów, a konta zapisywane bulk_create porcjami po
+    `chunk_size`. Gdy podano `classroom`, utworzeni uczniowie są zapisywani
+    do klasy w tej samej transakcji; `provisioned_by` to id zakładającego
+    nauczyciela. Wygenerowane hasła zwracane są raz, w raporcie.
+    """
+    start = time.perf_counter()
+    valid, errors = validate_rows(rows)
+
+    hashes = hash_passwords([data['password'] for _, data, _ in valid], workers)
+    users = []
+    generated = {}
+    for (index, data, was_generated), password_hash in zip(valid, hashes):
+        if was_generated:
+            generated[index] = (data['username'], data['password'])
+        users.append((index, CustomUser(
+            username=data['username'],
+            email=data.get('email', ''),
+            first_name=data.get('first_name', ''),
+            last_name=data.get('last_name', ''),
+            age=data.get('age'),
+            parent_email=data['parent_email'],
+            role='student',
+            password=password_hash,
+            provisioned_by_id=provisioned_by,
+        )))
+
+    created = 0
+    with transaction.atomic():
+        for offset in range(0, len(users), chunk_size):
+            inserted = _insert(users[offset:offset + chunk_size], errors)
+            created += len(inserted)
+            if classroom is not None and inserted:
+                ClassroomMembership.objects.bulk_create(
+                    [ClassroomMembership(classroom=classroom, student=user) for user in inserted]
+                )
+
+    failed = {error['row'] for error in errors}
+    elapsed = time.perf_counter() - start
+    logger.info(f"Utworzono {created} kont uczniów w {elapsed:.2f}s ({len(errors)} błędnych wierszy)")
+    return {
+        'created': created,
+        'failed': len(errors),
+        'errors': sorted(errors, key=lambda error: error['row']),
+        'generated_passwords': {
+            username: password for index, (username, password) in generated.items() if index not in failed
+        },
+        'duration': round(elapsed, 3),
+        'users_per_sec': round(created / elapsed, 1) if elapsed else 0,
+    }
+
+
+def provisioning_job_key(job_id):
+    return f'provisioning:{job_id}'
+
+
+def start_provisioning_job(rows, owner_id, classroom=None):
+    """Zleca import listy klasy zadaniu Celery; zwraca id zadania do odpytywania o stan"""
+    from .tasks import provision_roster
+
+    job_id = str(uuid.uuid4())
+    cache.set(
+        provisioning_job_key(job_id),
+        {'owner': str(owner_id), 'status': 'pending'},
+        settings.PROVISIONING_JOB_TTL
+    )
+    classroom_id = str(classroom.pk) if classroom is not None else None
+    transaction.on_commit(lambda: provision_roster.delay(job_id, rows, classroom_id))
+    return job_id
+
+
+def run_provisioning_job(job_id, rows, classroom_id=None):
+    """Wykonuje zlecony import i zapisuje raport (z wygenerowanymi hasłami) w cache zadania.
+
+    Zwraca podsumowanie bez haseł - trafia ono do backendu wyników Celery.
+    """
+    key = provisioning_job_key(job_id)
+    job = cache.get(key)
+    if job is None:
+        logger.warning(f"Zadanie importu {job_id} wygasło przed uruchomieniem")
+        return None
+
+    classroom = Classroom.objects.filter(pk=classroom_id).first() if classroom_id else None
+    try:
+        report = provision_students(rows, classroom=classroom, provisioned_by=job['owner'])
+    except Exception:
+        cache.set(key, dict(job, status='failed'), settings.PROVISIONING_JOB_TTL)
+        raise
+    cache.set(key, dict(job, status='done', report=report), settings.PROVISIONING_JOB_TTL)
+    return {'created': report['created'], 'failed': report['failed']}
+
+
+def pop_provisioning_job(job_id, owner_id):
+    """Stan zadania importu właściciela albo None; zakończone zadanie jest usuwane (hasła wydajemy raz)"""
+    key = provisioning_job_key(job_id)
+    job = cache.get(key)
+    if job is None or job['owner'] != str(owner_id):
+        return None
+    if job['status'] != 'pending':
+        cache.delete(key)
+    return job
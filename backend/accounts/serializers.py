@@ -1,7 +1,12 @@
 # backend/accounts/serializers.py
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from .models import CustomUser
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from api.mixins import SparseFieldsetMixin
+from .avatars import avatar_urls
+from .models import Classroom, CustomUser
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
@@ -30,22 +35,75 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class AvatarUrlsMixin(serializers.Serializer):
+    """Adresy miniatur awatara - listy nie powinny odsyłać do pełnowymiarowego oryginału"""
+    avatar_urls = serializers.SerializerMethodField()
+
+    def get_avatar_urls(self, obj):
+        return avatar_urls(obj, self.context.get('request'))
+
+
+class UserSerializer(SparseFieldsetMixin, AvatarUrlsMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = [
             'id', 'username', 'email', 'role', 'age', 'points', 
-            'level', 'avatar', 'parent_email', 'created_at'
+            'level', 'avatar', 'avatar_urls', 'parent_email', 'created_at'
         ]
-        read_only_fields = ['id', 'points', 'level', 'created_at']
+        read_only_fields = ['id', 'points', 'level', 'avatar', 'created_at']
+        # Kolumny czytane przez pola wyliczane (dla ?fields=)
+        sparse_columns = {'avatar_urls': ['avatar_renditions']}
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, AvatarUrlsMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name', 
-            'role', 'age', 'points', 'level', 'avatar', 
+            'role', 'age', 'points', 'level', 'avatar', 'avatar_urls',
             'parent_email', 'two_factor_enabled', 'created_at'
         ]
-        read_only_fields = ['id', 'points', 'level', 'created_at', 'role']
+        # Awatar zmienia się przez potok miniatur (store_avatar), nie przez zapis modelu
+        read_only_fields = ['id', 'points', 'level', 'avatar', 'created_at', 'role']
+
+
+class ClassroomSerializer(serializers.ModelSerializer):
+    teacher_name = serializers.CharField(source='teacher.username', read_only=True)
+    student_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Classroom
+        fields = ['id', 'name', 'teacher', 'teacher_name', 'student_count', 'created_at']
+        read_only_fields = ['id', 'teacher', 'created_at']
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """Odświeżanie z rotacją: zużyty token refresh trafia na czarną listę w Redis"""
+
+    def validate(self, attrs):
+        from .authentication import get_auth_state
+        from .blacklist import blacklist_token, is_blacklisted
+
+        refresh = self.token_class(attrs['refresh'])
+
+        # Rola i aktywność z bieżącego stanu konta, nie z chwili logowania
+        state = get_auth_state(refresh[api_settings.USER_ID_CLAIM])
+        if state is None or not state['is_active']:
+            raise InvalidToken('Konto nie istnieje lub jest nieaktywne')
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            accepted = blacklist_token(refresh)
+        else:
+            accepted = not is_blacklisted(refresh)
+        if not accepted:
+            raise InvalidToken('Token został już użyty lub unieważniony')
+
+        refresh['role'] = state['role']
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
@@ -0,0 +1,43 @@
+# backend/accounts/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from api.models import UserAchievement
+from api.signals import progress_changed
+from .authentication import invalidate_auth_state
+from .models import CustomUser
+from .stats import bump_stats_version
+
+# Wysyłany po przyznaniu punktów; argumenty: user_ids, points (przyrost na użytkownika)
+points_awarded = Signal()
+
+
+def _bump_on_commit(user_ids):
+    transaction.on_commit(lambda: bump_stats_version(user_ids))
+
+
+@receiver(progress_changed)
+def invalidate_stats_on_progress(sender, user_id, **kwargs):
+    """Nowa wersja statystyk po zmianie ukończonych lekcji lub ocen"""
+    _bump_on_commit([user_id])
+
+
+@receiver(points_awarded)
+def invalidate_stats_on_points(sender, user_ids, **kwargs):
+    """Nowa wersja statystyk po przyznaniu punktów"""
+    _bump_on_commit(user_ids)
+
+
+@receiver(post_save, sender=UserAchievement)
+@receiver(post_delete, sender=UserAchievement)
+def invalidate_stats_on_achievement(sender, instance, **kwargs):
+    """Nowa wersja statystyk po zmianie osiągnięć"""
+    _bump_on_commit([instance.user_id])
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_auth_state(sender, instance, **kwargs):
+    """Zmiana roli, dezaktywacja lub usunięcie konta unieważnia stan w cache"""
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_auth_state([user_id]))
@@ -0,0 +1,88 @@
+# backend/accounts/stats.py
+import uuid
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import CustomUser
+
+STATS_CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(user_id):
+    return f'accounts:stats_version:{user_id}'
+
+
+def _stats_key(user_id, version):
+    return f'accounts:stats:{user_id}:{version}'
+
+
+def bump_stats_version(user_ids):
+    """Unieważnia statystyki użytkowników (nowa wersja = nowy klucz w cache)"""
+    cache.set_many({_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, None)
+
+
+def _versions(user_ids):
+    versions = cache.get_many([_version_key(user_id) for user_id in user_ids])
+    missing = {}
+    result = {}
+    for user_id in user_ids:
+        version = versions.get(_version_key(user_id))
+        if version is None:
+            version = missing[_version_key(user_id)] = uuid.uuid4().hex
+        result[user_id] = version
+    if missing:
+        cache.set_many(missing, None)
+    return result
+
+
+def compute_stats(user_ids):
+    """Liczy statystyki wielu użytkowników jednym zapytaniem.
+
+    Punkty i poziom pochodzą z users, liczniki lekcji z UserProgress
+    (LEFT JOIN), a liczba osiągnięć z podzapytania skorelowanego.
+    """
+    from api.models import UserAchievement
+
+    achievements = UserAchievement.objects.filter(
+        user=OuterRef('pk')
+    ).order_by().values('user').annotate(total=Count('id')).values('total')
+
+    rows = CustomUser.objects.filter(id__in=user_ids).annotate(
+        achievements_count=Coalesce(Subquery(achievements, output_field=IntegerField()), 0)
+    ).values(
+        'id',
+        'points',
+        'level',
+        'achievements_count',
+        'progress_summary__tasks_completed',
+        'progress_summary__score_sum',
+    )
+
+    stats = {}
+    for row in rows:
+        completed = row['progress_summary__tasks_completed'] or 0
+        score_sum = row['progress_summary__score_sum'] or 0
+        stats[row['id']] = {
+            'total_points': row['points'],
+            'level': row['level'],
+            'completed_lessons': completed,
+            'achievements': row['achievements_count'],
+            'avg_score': round(score_sum / completed, 2) if completed else 0,
+        }
+    return stats
+
+
+def get_stats(user_ids):
+    """Zwraca statystyki użytkowników z cache, licząc brakujące jednym zapytaniem"""
+    user_ids = [uuid.UUID(str(user_id)) for user_id in user_ids]
+    versions = _versions(user_ids)
+    keys = {user_id: _stats_key(user_id, version) for user_id, version in versions.items()}
+    cached = cache.get_many(list(keys.values()))
+
+    stats = {user_id: cached[key] for user_id, key in keys.items() if key in cached}
+    missing = [user_id for user_id in user_ids if user_id not in stats]
+    if missing:
+        computed = compute_stats(missing)
+        cache.set_many({keys[user_id]: data for user_id, data in computed.items()}, STATS_CACHE_TIMEOUT)
+        stats.update(computed)
+    return stats
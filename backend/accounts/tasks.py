@@ -0,0 +1,44 @@
+# backend/accounts/tasks.py
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_leaderboards():
+    """Odbudowuje rankingi uczniów (zmiany wieku, roli i usunięte konta)"""
+    from .leaderboard import rebuild
+
+    return rebuild()
+
+
+@shared_task
+def provision_roster(job_id, rows, classroom_id=None):
+    """Zakłada konta uczniów z listy klasy w tle (hashowanie haseł w puli procesów)"""
+    from .provisioning import run_provisioning_job
+
+    return run_provisioning_job(job_id, rows, classroom_id)
+
+
+@shared_task
+def generate_avatar_renditions(user_id, source):
+    """Generuje miniatury WebP/JPEG przesłanego awatara"""
+    from django.core.files.storage import default_storage
+    from .avatars import build_renditions, remove_stale_renditions
+    from .models import CustomUser
+
+    if not CustomUser.objects.filter(pk=user_id, avatar=source).exists():
+        return None  # w międzyczasie przesłano nowszy awatar
+
+    renditions = build_renditions(user_id, source)
+    names = {name for formats in renditions.values() for name in formats.values()}
+    # Warunek na avatar: wynik starszego zadania nie nadpisze nowszego awatara
+    if not CustomUser.objects.filter(pk=user_id, avatar=source).update(avatar_renditions=renditions):
+        for name in names:
+            default_storage.delete(name)
+        return None
+
+    remove_stale_renditions(user_id, keep=names)
+    logger.info(f"Wygenerowano miniatury awatara użytkownika {user_id}")
+    return renditions
@@ -0,0 +1,41 @@
+# backend/accounts/tests.py
+import threading
+import pytest
+from django.db import connection
+from accounts.models import POINTS_PER_LEVEL, CustomUser
+from analytics.models import UserProgress
+
+THREADS = 8
+AWARDS = 25
+POINTS = 7
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_award_points_loses_no_updates():
+    user = CustomUser.objects.create_user(username='concurrent_points', password='pw', role='student')
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def worker():
+        try:
+            barrier.wait()
+            for _ in range(AWARDS):
+                CustomUser.objects.award_points([user.id], POINTS)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    expected = THREADS * AWARDS * POINTS
+    user.refresh_from_db()
+    assert user.points == expected
+    assert user.level == expected // POINTS_PER_LEVEL + 1
+    summary = UserProgress.objects.get(user=user)
+    assert (summary.points_earned, summary.level) == (user.points, user.level)
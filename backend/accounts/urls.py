@@ -2,14 +2,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import register, login, UserViewSet
+from .views import register, login, logout, UserViewSet, ClassroomViewSet
 
 router = DefaultRouter()
 router.register('users', UserViewSet)
+router.register('classrooms', ClassroomViewSet, basename='classroom')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('register/', register, name='register'),
     path('login/', login, name='login'),
+    path('logout/', logout, name='logout'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
\ No newline at end of file
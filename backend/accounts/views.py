@@ -1,15 +1,27 @@
 # backend/accounts/views.py
+import uuid
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from .models import CustomUser
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q
+from api.activity import log_activity
+from api.mixins import SparseQuerysetMixin
+from api.pagination import KeysetPagination
+from .authentication import tokens_for_user
+from .avatars import store_avatar, stream_uploads_to_disk
+from .blacklist import blacklist_token
+from .models import Classroom, ClassroomMembership, CustomUser
 from .serializers import (
     UserRegistrationSerializer, 
     UserSerializer, 
-    UserProfileSerializer
+    UserProfileSerializer,
+    ClassroomSerializer
 )
 
 @api_view(['POST'])
@@ -21,7 +33,7 @@ def register(request):
         user = serializer.save()
         
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         
         return Response({
             'message': 'Rejestracja pomyślna',
@@ -45,7 +57,8 @@ def login(request):
     user = authenticate(username=username, password=password)
     
     if user is not None:
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
+        log_activity(user, 'login')
         
         return Response({
             'user': UserSerializer(user).data,
@@ -61,57 +74,327 @@ def login(request):
     )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def logout(request):
+    """Wylogowanie: unieważnia token refresh do końca jego ważności"""
+    try:
+        refresh = RefreshToken(request.data.get('refresh', ''))
+    except TokenError:
+        return Response({'error': 'Nieprawidłowy token'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    blacklist_token(refresh)
+    return Response(status=status.HTTP_205_RESET_CONTENT)
+
+MAX_STATS_USERS = 500
+MAX_ROSTER_SIZE = 1000
+
+
+class UserViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'admin':
             return CustomUser.objects.all()
         elif user.role == 'teacher':
-            return CustomUser.objects.filter(role='student')
+            # Tylko uczniowie z klas nauczyciela, nie cała baza
+            return CustomUser.objects.students_of(user)
         else:
             return CustomUser.objects.filter(id=user.id)
     
     @action(detail=False, methods=['get'])
     def me(self, request):
         """Dane zalogowanego użytkownika"""
-        serializer = UserProfileSerializer(request.user)
+        serializer = UserProfileSerializer(request.user, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=False, methods=['patch'])
     def update_profile(self, request):
         """Aktualizacja profilu"""
+        stream_uploads_to_disk(request)
         serializer = UserProfileSerializer(
             request.user, 
             data=request.data, 
-            partial=True
+            partial=True,
+            context={'request': request}
         )
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                user = serializer.save()
+                if 'avatar' in request.FILES:
+                    store_avatar(user, request.FILES['avatar'])
+                    user.refresh_from_db(fields=['avatar', 'avatar_renditions'])
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'])
+    def avatar(self, request):
+        """Przesłanie awatara; miniatury powstają w tle (avatar_urls uzupełni się po chwili)"""
+        stream_uploads_to_disk(request)
+        upload = request.FILES.get('avatar')
+        if upload is None:
+            return Response({'error': 'Brak pliku avatar'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            store_avatar(request.user, upload)
+        user = CustomUser.objects.get(pk=request.user.pk)
+        serializer = UserProfileSerializer(user, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Statystyki użytkownika"""
+        from .stats import get_stats
+        
+        # Jedno zapytanie agregujące, a przy kolejnych wywołaniach - wersjonowany cache
+        stats = get_stats([request.user.id])[request.user.id]
+        return Response(stats)
+    
+    @action(detail=False, methods=['get'])
+    def stats_bulk(self, request):
+        """Statystyki wielu użytkowników (?ids=id1,id2,...) dla widoków nauczyciela"""
+        from .stats import get_stats
+        
+        if request.user.role not in ['admin', 'teacher']:
+            return Response(
+                {'error': 'Dostępne tylko dla nauczycieli i administratorów'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            ids = {uuid.UUID(value) for value in request.query_params.get('ids', '').split(',') if value}
+        except ValueError:
+            return Response({'error': 'Nieprawidłowy identyfikator użytkownika'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_STATS_USERS:
+            return Response(
+                {'error': f'Maksymalnie {MAX_STATS_USERS} użytkowników w jednym żądaniu'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Tylko użytkownicy widoczni dla pytającego (nauczyciel - uczniowie)
+        allowed = self.get_queryset().filter(id__in=ids).values_list('id', flat=True)
+        stats = get_stats(allowed)
+        return Response({str(user_id): data for user_id, data in stats.items()})
+    
+    @action(detail=False, methods=['get'])
+    def leaderboard(self, request):
+        """Ranking uczniów: top-N, miejsce użytkownika i jego sąsiedzi"""
+        from . import leaderboard
+        
         user = request.user
+        board = request.query_params.get('board', 'global')
+        if board == 'global':
+            key = leaderboard.global_key()
+        elif board == 'level':
+            level = request.query_params.get('level', user.level)
+            try:
+                key = leaderboard.level_key(int(level))
+            except ValueError:
+                return Response({'error': 'Nieprawidłowy poziom'}, status=status.HTTP_400_BAD_REQUEST)
+        elif board == 'age':
+            group = request.query_params.get('age_group') or leaderboard.age_group(user.age)
+            if group not in [name for name, _, _ in leaderboard.AGE_GROUPS]:
+                return Response({'error': 'Nieprawidłowa grupa wiekowa'}, status=status.HTTP_400_BAD_REQUEST)
+            key = leaderboard.age_key(group)
+        else:
+            return Response(
+                {'error': 'Dozwolone tablice: global, level, age'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            limit = 10
+        
+        return Response({
+            'board': key.split(':', 1)[1],
+            'top': leaderboard.top(key, limit),
+            'me': leaderboard.rank(key, user.id),
+            'around': leaderboard.around(key, user.id),
+        })
+    
+    @action(detail=False, methods=['post'])
+    def provision(self, request):
+        """Zakłada konta uczniów z listy klasy (plik CSV/JSON w polu file albo lista students).
+
+        Opcjonalne pole classroom zapisuje utworzonych uczniów do klasy wywołującego.
+        Do PROVISIONING_SYNC_LIMIT uczniów konta powstają w żądaniu (201 z raportem),
+        większe listy zakłada zadanie w tle (202 z adresem stanu).
+        """
+        from django.conf import settings
+        from .provisioning import parse_roster, provision_students, start_provisioning_job
+        
+        if request.user.role not in ['admin', 'teacher']:
+            return Response(
+                {'error': 'Dostępne tylko dla nauczycieli i administratorów'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                fmt = 'json' if upload.name.lower().endswith('.json') else 'csv'
+                rows = parse_roster(upload.read(), fmt)
+            else:
+                rows = request.data.get('students') if isinstance(request.data, dict) else request.data
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'error': f'Nieprawidłowy plik: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not isinstance(rows, list) or not rows:
+            return Response({'error': 'Lista uczniów jest pusta'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_ROSTER_SIZE:
+            return Response(
+                {'error': f'Maksymalnie {MAX_ROSTER_SIZE} uczniów w jednym żądaniu'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        classroom = None
+        classroom_id = request.data.get('classroom') if hasattr(request.data, 'get') else None
+        if classroom_id:
+            classrooms = Classroom.objects.all()
+            if request.user.role == 'teacher':
+                classrooms = classrooms.filter(teacher_id=request.user.id)
+            try:
+                classroom = classrooms.get(pk=classroom_id)
+            except (Classroom.DoesNotExist, ValidationError):
+                return Response({'error': 'Nie znaleziono klasy'}, status=status.HTTP_404_NOT_FOUND)
         
-        from api.models import Progress, UserAchievement
-        
-        stats = {
-            'total_points': user.points,
-            'level': user.level,
-            'completed_lessons': Progress.objects.filter(
-                user=user, 
-                completed=True
-            ).count(),
-            'achievements': UserAchievement.objects.filter(user=user).count(),
-            'avg_score': Progress.objects.filter(user=user).aggregate(
-                models.Avg('score')
-            )['score__avg'] or 0,
-        }
-        
-        return Response(stats)
\ No newline at end of file
+        if len(rows) > settings.PROVISIONING_SYNC_LIMIT:
+            # Hashowanie setek haseł trwa minuty - dłużej niż limit czasu procesu obsługującego żądania
+            job_id = start_provisioning_job(rows, request.user.id, classroom)
+            return Response({
+                'job_id': job_id,
+                'status': 'pending',
+                'status_url': self.reverse_action('provision-status', kwargs={'job_id': job_id}),
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        report = provision_students(rows, classroom=classroom, provisioned_by=request.user.id)
+        return Response(
+            report,
+            status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @action(detail=False, methods=['get'], url_path=r'provision/(?P<job_id>[0-9a-f-]{36})', url_name='provision-status')
+    def provision_status(self, request, job_id=None):
+        """Stan importu w tle: 202 w trakcie, 200 z raportem (zwracany raz) po zakończeniu"""
+        from .provisioning import pop_provisioning_job
+        
+        job = pop_provisioning_job(job_id, request.user.id)
+        if job is None:
+            return Response({'error': 'Nie znaleziono zadania importu'}, status=status.HTTP_404_NOT_FOUND)
+        if job['status'] == 'pending':
+            return Response({'job_id': job_id, 'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+        if job['status'] == 'failed':
+            return Response(
+                {'job_id': job_id, 'status': 'failed', 'error': 'Import listy klasy nie powiódł się'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return Response(dict(job['report'], job_id=job_id, status='done'))
+
+
+class ClassroomViewSet(viewsets.ModelViewSet):
+    serializer_class = ClassroomSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        user = self.request.user
+        classrooms = Classroom.objects.select_related('teacher').annotate(
+            student_count=Count('memberships')
+        ).order_by('name', 'id')
+        if user.role == 'admin':
+            return classrooms
+        elif user.role == 'teacher':
+            return classrooms.filter(teacher_id=user.id)
+        return classrooms.filter(
+            id__in=ClassroomMembership.objects.filter(student_id=user.id).values('classroom_id')
+        )
+    
+    def create(self, request, *args, **kwargs):
+        if request.user.role not in ['admin', 'teacher']:
+            return Response(
+                {'error': 'Dostępne tylko dla nauczycieli i administratorów'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        serializer.save(teacher_id=self.request.user.id)
+    
+    def check_object_permissions(self, request, obj):
+        super().check_object_permissions(request, obj)
+        # Uczeń widzi swoje klasy, ale nie może ich zmieniać ani oglądać wyników kolegów
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') or self.action in ('dashboard', 'activity'):
+            if request.user.role not in ['admin', 'teacher']:
+                self.permission_denied(request, message='Dostępne tylko dla nauczycieli i administratorów')
+    
+    @action(detail=True, methods=['get'])
+    def dashboard(self, request, pk=None):
+        """Ukończenia, średni wynik, punkty i ostatnia aktywność wszystkich uczniów klasy"""
+        from .classrooms import class_dashboard
+        
+        return Response(class_dashboard(self.get_object()))
+    
+    @action(detail=True, methods=['get'])
+    def activity(self, request, pk=None):
+        """Strumień aktywności uczniów klasy od najnowszych (?action=, ?cursor=)"""
+        from api.fast import ValuesPlan
+        from api.models import ActivityLog
+        from api.pagination import ActivityPagination
+        from api.serializers import ActivityLogSerializer
+        
+        classroom = self.get_object()
+        feed = ActivityLog.objects.filter(user_id__in=classroom.memberships.values('student_id'))
+        action_name = request.query_params.get('action')
+        if action_name:
+            feed = feed.filter(action=action_name)
+        
+        plan = ValuesPlan.for_serializer(ActivityLogSerializer)
+        paginator = ActivityPagination()
+        page = paginator.paginate_queryset(feed.values(*plan.columns), request, self)
+        return paginator.get_paginated_response(plan.rows(page))
+    
+    @action(detail=True, methods=['post', 'delete'])
+    def students(self, request, pk=None):
+        """Dodaje (POST) lub usuwa (DELETE) uczniów klasy: {"student_ids": [...]}"""
+        classroom = self.get_object()
+        ids = request.data.get('student_ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'Oczekiwano niepustej listy student_ids'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_ROSTER_SIZE:
+            return Response(
+                {'error': f'Maksymalnie {MAX_ROSTER_SIZE} uczniów w jednym żądaniu'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids = {uuid.UUID(str(value)) for value in ids}
+        except ValueError:
+            return Response({'error': 'Nieprawidłowy identyfikator użytkownika'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.method == 'DELETE':
+            removed, _ = classroom.memberships.filter(student_id__in=ids).delete()
+            return Response({'removed': removed})
+        
+        found = set(CustomUser.objects.filter(id__in=ids, role='student').values_list('id', flat=True))
+        students = found
+        if request.user.role != 'admin':
+            # Nauczyciel dopisuje tylko uczniów, których konta założył, albo już uczących się
+            # w jego klasach - pozostałych (np. zarejestrowanych samodzielnie) zapisuje administrator
+            students = set(CustomUser.objects.filter(id__in=found).filter(
+                Q(provisioned_by_id=request.user.id) | Q(id__in=ClassroomMembership.objects.filter(
+                    classroom__teacher_id=request.user.id
+                ).values('student_id'))
+            ).values_list('id', flat=True))
+        ClassroomMembership.objects.bulk_create(
+            [ClassroomMembership(classroom=classroom, student_id=student_id) for student_id in students],
+            ignore_conflicts=True
+        )
+        return Response({
+            'added': len(students),
+            'not_found': sorted(str(student_id) for student_id in ids - found),
+            'forbidden': sorted(str(student_id) for student_id in found - students),
+        })
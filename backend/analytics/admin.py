@@ -1,10 +1,10 @@
 # backend/analytics/admin.py
 from django.contrib import admin
-from .models import UserProgress, TaskStats
+from .models import UserProgress, TaskStats, DailyActivity
 
 @admin.register(UserProgress)
 class UserProgressAdmin(admin.ModelAdmin):
-    list_display = ['user', 'tasks_completed', 'points_earned', 'level', 'updated_at']
+    list_display = ['user', 'tasks_completed', 'points_earned', 'level', 'score_sum', 'updated_at']
     list_filter = ['level', 'created_at']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['id', 'created_at', 'updated_at']
@@ -15,4 +15,12 @@ class TaskStatsAdmin(admin.ModelAdmin):
     list_display = ['user', 'task_name', 'attempts', 'successes', 'avg_time', 'updated_at']
     list_filter = ['created_at', 'updated_at']
     search_fields = ['user__username', 'task_name']
-    readonly_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['id', 'created_at', 'updated_at']
+
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'lessons_completed', 'points_earned', 'score_sum']
+    list_filter = ['date']
+    search_fields = ['user__username']
+    readonly_fields = ['id']
@@ -0,0 +1,82 @@
+# backend/analytics/counters.py
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from accounts.models import CustomUser
+from .models import UserProgress
+
+SUMMARY_FIELDS = ['tasks_completed', 'points_earned', 'level', 'score_sum', 'updated_at']
+
+
+def rebuild_user_progress(user_ids=None, batch_size=5000):
+    """Przelicza podsumowania z historii jednym zapytaniem grupującym i zapisuje je paczkami"""
+    users = CustomUser.objects.all()
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    rows = users.annotate(
+        completed=Count('progress', filter=Q(progress__completed=True)),
+        score=Sum('progress__score', filter=Q(progress__completed=True)),
+    ).values('id', 'points', 'level', 'completed', 'score').order_by().iterator(chunk_size=batch_size)
+
+    now = timezone.now()
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(UserProgress(
+            user_id=row['id'],
+            tasks_completed=row['completed'],
+            points_earned=row['points'],
+            level=row['level'],
+            score_sum=row['score'] or 0,
+            updated_at=now
+        ))
+        if len(batch) >= batch_size:
+            total += _save(batch)
+            batch = []
+    return total + _save(batch)
+
+
+def _save(batch):
+    if not batch:
+        return 0
+    UserProgress.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=SUMMARY_FIELDS
+    )
+    return len(batch)
+
+
+def _apply(user_ids, **updates):
+    """Aktualizuje wiersze podsumowań atomowo (F-wyrażenia)"""
+    updates['updated_at'] = timezone.now()
+    rows = UserProgress.objects.filter(user_id__in=user_ids)
+    if rows.update(**updates) < len(user_ids):
+        # Brak wiersza: liczymy go z historii, która zawiera już bieżącą zmianę
+        existing = set(rows.values_list('user_id', flat=True))
+        rebuild_user_progress([user_id for user_id in user_ids if user_id not in existing])
+
+
+def apply_progress_delta(user_id, completed_delta=0, score_delta=0.0):
+    """Dodaje zmianę liczby ukończonych lekcji i sumy ocen do podsumowania użytkownika"""
+    _apply(
+        [user_id],
+        tasks_completed=F('tasks_completed') + completed_delta,
+        score_sum=F('score_sum') + score_delta,
+    )
+
+
+def apply_points(user_ids, points):
+    """Dodaje przyznane punkty i przenosi poziom z tabeli użytkowników (jedno UPDATE)"""
+    _apply(
+        user_ids,
+        points_earned=F('points_earned') + points,
+        level=Subquery(CustomUser.objects.filter(id=OuterRef('user_id')).values('level')),
+    )
+
+
+def get_user_progress(user):
+    """Zwraca podsumowanie użytkownika (jeden odczyt; puste, gdy jeszcze nie istnieje)"""
+    return UserProgress.objects.filter(user=user).first() or UserProgress(
+        user=user, points_earned=user.points, level=user.level
+    )
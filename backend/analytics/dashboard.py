@@ -0,0 +1,69 @@
+# backend/analytics/dashboard.py
+from django.core.cache import cache
+from django.db.models import Count, FilteredRelation, Q
+from django.utils import timezone
+from api.models import Course
+from .counters import get_user_progress
+from .rollups import ACTIVITY_RANGES, activity_histogram
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 10
+
+
+def dashboard_cache_key(user_id, days=7):
+    return f'analytics:dashboard:{user_id}:{days}'
+
+
+def invalidate_dashboard(user_id):
+    """Usuwa zbuforowany dashboard użytkownika"""
+    cache.delete_many([dashboard_cache_key(user_id, days) for days in ACTIVITY_RANGES])
+
+
+def get_dashboard_data(user, days=7):
+    """Zwraca część dashboardu zależną od postępów (z cache lub z bazy)"""
+    today = timezone.localdate()
+    key = dashboard_cache_key(user.id, days)
+
+    data = cache.get(key)
+    if data is None or data['date'] != today.isoformat():
+        data = build_dashboard_data(user, days)
+        cache.set(key, data, DASHBOARD_CACHE_TIMEOUT)
+    return data
+
+
+def build_dashboard_data(user, days=7):
+    """Buduje dane dashboardu stałą liczbą zapytań (niezależnie od liczby kursów)"""
+    # Jedno zapytanie: liczniki utrzymywane przyrostowo w UserProgress
+    summary = get_user_progress(user)
+
+    # Jedno zapytanie grupujące: lekcje i ukończenia użytkownika per kurs
+    courses = Course.objects.filter(is_active=True).annotate(
+        active_lessons=FilteredRelation('lessons', condition=Q(lessons__is_active=True)),
+        user_progress=FilteredRelation(
+            'active_lessons__progress',
+            condition=Q(active_lessons__progress__user=user, active_lessons__progress__completed=True)
+        ),
+    ).annotate(
+        total_lessons=Count('active_lessons', distinct=True),
+        completed_lessons=Count('user_progress__lesson', distinct=True),
+    ).values('id', 'title', 'total_lessons', 'completed_lessons')
+
+    courses_stats = []
+    for course in courses:
+        total_lessons = course['total_lessons']
+        completed_lessons = course['completed_lessons']
+        courses_stats.append({
+            'course_id': course['id'],
+            'course_title': course['title'],
+            'total_lessons': total_lessons,
+            'completed_lessons': completed_lessons,
+            'progress_percentage': round((completed_lessons / total_lessons * 100) if total_lessons > 0 else 0, 2)
+        })
+
+    return {
+        'date': timezone.localdate().isoformat(),
+        'completed_lessons': summary.tasks_completed,
+        'average_score': summary.average_score,
+        'courses': courses_stats,
+        # Aktywność z dziennego podsumowania (odczyt zakresu zamiast skanu Progress)
+        'activity': activity_histogram(user, days),
+    }
@@ -0,0 +1,74 @@
+# backend/analytics/ingestion.py
+import uuid
+from collections import defaultdict
+from django.db import connection
+from django.utils import timezone
+from .models import TaskStats
+
+# Maksymalna liczba wierszy w jednym poleceniu INSERT
+UPSERT_CHUNK_SIZE = 1000
+
+_TABLE = TaskStats._meta.db_table
+
+_UPSERT_SQL = f'''
+    INSERT INTO {_TABLE}
+        (id, user_id, task_name, attempts, successes, avg_time, created_at, updated_at)
+    VALUES {{values}}
+    ON CONFLICT (user_id, task_name) DO UPDATE SET
+        attempts = {_TABLE}.attempts + EXCLUDED.attempts,
+        successes = {_TABLE}.successes + EXCLUDED.successes,
+        avg_time = ({_TABLE}.avg_time * {_TABLE}.attempts + EXCLUDED.avg_time * EXCLUDED.attempts)
+            / ({_TABLE}.attempts + EXCLUDED.attempts),
+        updated_at = EXCLUDED.updated_at
+'''
+
+
+def _prep(field_name, value):
+    return TaskStats._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+
+def aggregate_attempts(attempts):
+    """Sumuje próby per (użytkownik, zadanie): liczba, sukcesy, łączny czas"""
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    for attempt in attempts:
+        row = totals[(str(attempt['user_id']), attempt['task_name'])]
+        row[0] += 1
+        row[1] += 1 if attempt['success'] else 0
+        row[2] += attempt['time']
+    return totals
+
+
+def record_task_attempts(attempts):
+    """Zapisuje paczkę prób zadań w TaskStats.
+
+    Próby są najpierw sumowane w pamięci, a potem stosowane jednym
+    wielowierszowym INSERT ... ON CONFLICT na porcję - liczniki rosną po
+    stronie bazy, a avg_time łączy się jako średnia ważona liczbą prób,
+    więc równoległe paczki nie gubią aktualizacji. Wiersze idą w stałej
+    kolejności kluczy, co chroni przed zakleszczeniami między paczkami.
+    Zwraca liczbę zaktualizowanych par (użytkownik, zadanie).
+    """
+    totals = aggregate_attempts(attempts)
+    if not totals:
+        return 0
+
+    now = _prep('updated_at', timezone.now())
+    rows = sorted(totals.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+            params = []
+            for (user_id, task_name), (count, successes, total_time) in chunk:
+                params.extend([
+                    _prep('id', uuid.uuid4()),
+                    _prep('user', user_id),
+                    task_name,
+                    count,
+                    successes,
+                    total_time / count,
+                    now,
+                    now,
+                ])
+            values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk))
+            cursor.execute(_UPSERT_SQL.format(values=values), params)
+    return len(rows)
@@ -0,0 +1,73 @@
+# backend/analytics/management/commands/backfill_daily_activity.py
+# Uruchomienie: python manage.py backfill_daily_activity [--reset]
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from api.models import Progress
+from analytics.models import DailyActivity
+
+
+class Command(BaseCommand):
+    help = 'Odbudowuje dzienne podsumowania aktywności na podstawie historii postępów'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Liczba wierszy zapisywanych jednym zapytaniem'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Usuwa istniejące podsumowania przed odbudową'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # Jedno zapytanie grupujące po (użytkownik, dzień) czytane strumieniowo;
+        # ukończenia bez daty liczą się w dniu ostatniego zapisu (jak w progress_delta)
+        rows = Progress.objects.filter(
+            completed=True
+        ).annotate(
+            day=TruncDate(Coalesce('completed_at', 'updated_at'))
+        ).values('user_id', 'day').annotate(
+            lessons=Count('id'),
+            points=Sum('lesson__points'),
+            score=Sum('score')
+        ).order_by().iterator(chunk_size=batch_size)
+
+        total = 0
+        with transaction.atomic():
+            if options['reset']:
+                DailyActivity.objects.all().delete()
+
+            batch = []
+            for row in rows:
+                batch.append(DailyActivity(
+                    user_id=row['user_id'],
+                    date=row['day'],
+                    lessons_completed=row['lessons'],
+                    points_earned=row['points'] or 0,
+                    score_sum=row['score'] or 0
+                ))
+                if len(batch) >= batch_size:
+                    total += self.flush(batch)
+                    batch = []
+            total += self.flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Zapisano {total} dziennych podsumowań'))
+
+    def flush(self, batch):
+        if not batch:
+            return 0
+        DailyActivity.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=['lessons_completed', 'points_earned', 'score_sum']
+        )
+        return len(batch)
@@ -0,0 +1,103 @@
+# backend/analytics/management/commands/benchmark_dashboard.py
+# Uruchomienie: python manage.py benchmark_dashboard --courses 200
+
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from accounts.models import CustomUser
+from api.models import Course, Lesson, Progress
+from analytics.counters import rebuild_user_progress
+from analytics.dashboard import build_dashboard_data, get_dashboard_data, invalidate_dashboard
+
+EXPECTED_QUERIES = 3
+
+
+def legacy_dashboard_data(user):
+    """Poprzednia implementacja: dwa zapytania na kurs + siedem na histogram"""
+    completed = Progress.objects.filter(user=user, completed=True).count()
+    total_score = Progress.objects.filter(user=user).aggregate(avg=Avg('score'))['avg'] or 0
+
+    courses_stats = []
+    for course in Course.objects.filter(is_active=True):
+        total_lessons = course.lessons.filter(is_active=True).count()
+        completed_lessons = Progress.objects.filter(
+            user=user, lesson__course=course, completed=True
+        ).count()
+        courses_stats.append((course.id, total_lessons, completed_lessons))
+
+    today = timezone.localdate()
+    activity = [
+        Progress.objects.filter(user=user, completed_at__date=today - timedelta(days=i)).count()
+        for i in range(7)
+    ]
+    return completed, total_score, courses_stats, activity
+
+
+class Command(BaseCommand):
+    help = 'Porównuje czas i liczbę zapytań dashboardu analityki (przed/po)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=200, help='Liczba kursów do wygenerowania')
+        parser.add_argument('--lessons', type=int, default=10, help='Liczba lekcji na kurs')
+        parser.add_argument('--iterations', type=int, default=20, help='Liczba powtórzeń pomiaru')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed(options['courses'], options['lessons'])
+            self.run(user, options['iterations'])
+            transaction.set_rollback(True)
+        self.stdout.write('Dane testowe wycofane.')
+
+    def seed(self, num_courses, num_lessons):
+        user = CustomUser.objects.create_user(
+            username=f'bench_{random.randint(0, 10 ** 9)}', password='bench'
+        )
+        courses = Course.objects.bulk_create(
+            Course(title=f'Kurs {i}') for i in range(num_courses)
+        )
+        lessons = Lesson.objects.bulk_create(
+            Lesson(course=course, title=f'Lekcja {j}', points=10)
+            for course in courses for j in range(num_lessons)
+        )
+        now = timezone.now()
+        Progress.objects.bulk_create(
+            Progress(
+                user=user, lesson=lesson, completed=True, score=random.randint(50, 100),
+                completed_at=now - timedelta(days=random.randint(0, 30))
+            )
+            for lesson in random.sample(lessons, len(lessons) // 3)
+        )
+        rebuild_user_progress([user.id])
+        return user
+
+    def measure(self, label, func, iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        queries = len(ctx.captured_queries)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = (time.perf_counter() - start) / iterations * 1000
+
+        self.stdout.write(f'{label:<28} {elapsed:>9.2f} ms  {queries:>5} zapytań')
+        return queries
+
+    def run(self, user, iterations):
+        self.measure('przed (pętla per kurs)', lambda: legacy_dashboard_data(user), iterations)
+        queries = self.measure('po (agregacja)', lambda: build_dashboard_data(user), iterations)
+        if queries != EXPECTED_QUERIES:
+            raise CommandError(f'Oczekiwano {EXPECTED_QUERIES} zapytań, wykonano {queries}')
+
+        invalidate_dashboard(user.id)
+        get_dashboard_data(user)
+        cached = self.measure('po (cache)', lambda: get_dashboard_data(user), iterations)
+        if cached != 0:
+            raise CommandError(f'Trafienie w cache wykonało {cached} zapytań')
+
+        self.stdout.write(self.style.SUCCESS('Liczba zapytań nie zależy od liczby kursów.'))
@@ -0,0 +1,45 @@
+# backend/analytics/management/commands/benchmark_recommender.py
+# Uruchomienie: python manage.py benchmark_recommender --students 100000 --lessons 2000
+
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from analytics.recommender import TOP_K, co_completion_neighbors
+
+
+class Command(BaseCommand):
+    help = 'Mierzy czas budowy macierzy współukończeń na danych syntetycznych'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100000, help='Liczba uczniów')
+        parser.add_argument('--lessons', type=int, default=2000, help='Liczba lekcji')
+        parser.add_argument('--per-student', type=int, default=40, help='Średnia liczba ukończeń na ucznia')
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='Liczba sąsiadów na lekcję')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        n_students, n_lessons = options['students'], options['lessons']
+
+        # Popularność lekcji o rozkładzie zbliżonym do Zipfa
+        popularity = 1.0 / np.arange(1, n_lessons + 1)
+        popularity /= popularity.sum()
+
+        counts = rng.poisson(options['per_student'], n_students)
+        user_idx = np.repeat(np.arange(n_students), counts)
+        lesson_idx = rng.choice(n_lessons, size=len(user_idx), p=popularity)
+
+        self.stdout.write(
+            f'{n_students} uczniów × {n_lessons} lekcji, {len(user_idx)} ukończeń'
+        )
+
+        start = time.perf_counter()
+        rows, cols, scores = co_completion_neighbors(
+            user_idx, lesson_idx, n_lessons, top_k=options['top_k']
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Zbudowano {len(scores)} par sąsiadów w {elapsed:.2f} s '
+            f'({len(user_idx) / elapsed:,.0f} ukończeń/s)'
+        ))
@@ -0,0 +1,99 @@
+# backend/analytics/management/commands/benchmark_task_stats.py
+# Uruchomienie: python manage.py benchmark_task_stats --threads 8 --batches 50 --batch-size 200
+
+import random
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from accounts.models import CustomUser
+from analytics.ingestion import record_task_attempts
+from analytics.models import TaskStats
+
+
+class Command(BaseCommand):
+    help = 'Równoległy zapis prób zadań do TaskStats: przepustowość i brak zgubionych aktualizacji'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Liczba równoległych wątków')
+        parser.add_argument('--batches', type=int, default=50, help='Liczba paczek na wątek')
+        parser.add_argument('--batch-size', type=int, default=200, help='Liczba prób w paczce')
+        parser.add_argument('--users', type=int, default=5, help='Liczba użytkowników')
+        parser.add_argument('--tasks', type=int, default=20, help='Liczba różnych zadań')
+
+    def handle(self, *args, **options):
+        suffix = random.randint(0, 10 ** 9)
+        users = [
+            CustomUser.objects.create_user(username=f'bench_{suffix}_{i}', password='bench')
+            for i in range(options['users'])
+        ]
+        try:
+            self.run(users, options)
+        finally:
+            CustomUser.objects.filter(id__in=[u.id for u in users]).delete()
+            self.stdout.write('Dane testowe usunięte.')
+
+    def run(self, users, options):
+        task_names = [f'zadanie_{i}' for i in range(options['tasks'])]
+        expected = {}
+        lock = threading.Lock()
+        errors = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local = {}
+            try:
+                for _ in range(options['batches']):
+                    batch = []
+                    for _ in range(options['batch_size']):
+                        attempt = {
+                            'user_id': rng.choice(users).id,
+                            'task_name': rng.choice(task_names),
+                            'success': rng.random() < 0.6,
+                            'time': rng.uniform(5, 120),
+                        }
+                        batch.append(attempt)
+                        row = local.setdefault((str(attempt['user_id']), attempt['task_name']), [0, 0, 0.0])
+                        row[0] += 1
+                        row[1] += attempt['success']
+                        row[2] += attempt['time']
+                    record_task_attempts(batch)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+            with lock:
+                for key, (count, successes, total_time) in local.items():
+                    row = expected.setdefault(key, [0, 0, 0.0])
+                    row[0] += count
+                    row[1] += successes
+                    row[2] += total_time
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        if errors:
+            raise CommandError(f'Błąd zapisu: {errors[0]}')
+
+        total = options['threads'] * options['batches'] * options['batch_size']
+        self.stdout.write(f'Zapisano {total} prób w {elapsed:.2f}s ({total / elapsed:.0f} prób/s)')
+
+        mismatches = 0
+        for stats in TaskStats.objects.filter(user__in=users):
+            count, successes, total_time = expected.pop((str(stats.user_id), stats.task_name))
+            if (
+                stats.attempts != count
+                or stats.successes != successes
+                or abs(stats.avg_time - total_time / count) > 1e-6 * max(1, stats.avg_time)
+            ):
+                mismatches += 1
+        mismatches += len(expected)
+
+        if mismatches:
+            raise CommandError(f'{mismatches} wierszy TaskStats nie zgadza się z wysłanymi próbami')
+        self.stdout.write(self.style.SUCCESS('Liczniki i średnie czasy zgodne - brak zgubionych aktualizacji'))
@@ -0,0 +1,29 @@
+# backend/analytics/management/commands/purge_activity_logs.py
+# Uruchomienie: python manage.py purge_activity_logs --days 90 --batch-size 5000
+
+from django.core.management.base import BaseCommand
+from analytics.retention import purge_activity_logs
+
+
+class Command(BaseCommand):
+    help = 'Usuwa stare logi aktywności paczkami (wznawia przerwane czyszczenie)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Okres retencji w dniach')
+        parser.add_argument('--batch-size', type=int, help='Liczba wierszy usuwanych jednym zapytaniem')
+        parser.add_argument('--pause', type=float, help='Pauza między paczkami w sekundach')
+        parser.add_argument('--max-batches', type=int, help='Zatrzymaj po tylu paczkach (wznowienie przy kolejnym uruchomieniu)')
+
+    def handle(self, *args, **options):
+        result = purge_activity_logs(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            max_batches=options['max_batches']
+        )
+
+        status = 'zakończono' if result['finished'] else 'przerwano (można wznowić)'
+        self.stdout.write(self.style.SUCCESS(
+            f"Usunięto {result['deleted']} logów w {result['batches']} paczkach, "
+            f"{result['rows_per_sec']} wierszy/s - {status}"
+        ))
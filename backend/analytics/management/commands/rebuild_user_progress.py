@@ -0,0 +1,23 @@
+# backend/analytics/management/commands/rebuild_user_progress.py
+# Uruchomienie: python manage.py rebuild_user_progress [--batch-size 5000]
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from analytics.counters import rebuild_user_progress
+
+
+class Command(BaseCommand):
+    help = 'Uzgadnia liczniki UserProgress z historią postępów i punktami użytkowników'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Liczba wierszy zapisywanych jednym zapytaniem'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild_user_progress(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Uzgodniono {total} podsumowań użytkowników'))
@@ -4,11 +4,12 @@ from accounts.models import CustomUser
 
 class UserProgress(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='progress')
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='progress_summary')
     
     tasks_completed = models.IntegerField(default=0)
     points_earned = models.IntegerField(default=0)
     level = models.IntegerField(default=1)
+    score_sum = models.FloatField(default=0, help_text='Сумма оценок за пройденные уроки')
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -19,6 +20,12 @@ class UserProgress(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - Уровень {self.level}"
+    
+    @property
+    def average_score(self):
+        if not self.tasks_completed:
+            return 0
+        return round(self.score_sum / self.tasks_completed, 2)
 
 class TaskStats(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -39,3 +46,36 @@ class TaskStats(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.task_name}"
+
+class DailyActivity(models.Model):
+    """Dzienne podsumowanie aktywności użytkownika (aktualizowane przyrostowo)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    
+    lessons_completed = models.IntegerField(default=0)
+    points_earned = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    
+    class Meta:
+        verbose_name = 'Дневная активность'
+        verbose_name_plural = 'Дневная активность'
+        unique_together = ('user', 'date')
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+
+class LessonNeighbor(models.Model):
+    """Najbliżsi sąsiedzi lekcji wg współukończeń (liczone nocnym zadaniem)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lesson = models.ForeignKey('api.Lesson', on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey('api.Lesson', on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text='Podobieństwo kosinusowe współukończeń')
+    
+    class Meta:
+        verbose_name = 'Соседний урок'
+        verbose_name_plural = 'Соседние уроки'
+        unique_together = ('lesson', 'neighbor')
+    
+    def __str__(self):
+        return f"{self.lesson_id} → {self.neighbor_id} ({self.score:.3f})"
@@ -0,0 +1,245 @@
+# backend/analytics/recommender.py
+from array import array
+from collections import Counter, defaultdict
+from itertools import groupby
+import logging
+import uuid
+import numpy as np
+from scipy import sparse
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from api.models import Lesson, Progress
+from .models import LessonNeighbor
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 20
+RECOMMENDATIONS_CACHE_TIMEOUT = 60 * 60 * 26
+POPULAR_LESSONS_KEY = 'analytics:popular_lessons'
+POPULAR_LESSONS_TIMEOUT = 60 * 60
+POPULAR_LESSONS_POOL = 100
+
+
+def co_completion_neighbors(user_idx, lesson_idx, n_lessons, top_k=TOP_K):
+    """Liczy top-K sąsiadów każdej lekcji z par (użytkownik, lekcja).
+
+    Macierz współukończeń C = XᵀX liczona jest na rzadkich macierzach CSR
+    (pamięć rośnie z liczbą par współukończonych lekcji, a nie z n_lessons²),
+    a podobieństwo to cosinus: C[i, j] / sqrt(n_i * n_j). Zwraca (lekcje, sąsiedzi, wyniki).
+    """
+    user_idx = np.asarray(user_idx, dtype=np.int64)
+    lesson_idx = np.asarray(lesson_idx, dtype=np.int64)
+    empty = np.empty(0, dtype=np.int64)
+    if not len(user_idx) or n_lessons < 2:
+        return empty, empty, np.empty(0, dtype=np.float32)
+
+    completions = sparse.csr_matrix(
+        (np.ones(len(user_idx), dtype=np.float32), (user_idx, lesson_idx)),
+        shape=(int(user_idx.max()) + 1, n_lessons)
+    )
+    completions.sum_duplicates()
+    completions.data[:] = 1.0
+
+    co_counts = (completions.T @ completions).tocsr()
+    totals = np.sqrt(co_counts.diagonal())
+    totals[totals == 0] = 1.0
+    norm = sparse.diags(1.0 / totals).astype(np.float32)
+    similarity = (norm @ co_counts @ norm).tocsr()
+    similarity.setdiag(0.0)
+    similarity.eliminate_zeros()
+
+    rows, cols, scores = [], [], []
+    indptr, indices, data = similarity.indptr, similarity.indices, similarity.data
+    for lesson in range(n_lessons):
+        lo, hi = indptr[lesson], indptr[lesson + 1]
+        if lo == hi:
+            continue
+        row_scores = data[lo:hi]
+        if hi - lo > top_k:
+            top = np.argpartition(-row_scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(hi - lo)
+        rows.append(np.full(len(top), lesson, dtype=np.int64))
+        cols.append(indices[lo:hi][top].astype(np.int64))
+        scores.append(row_scores[top])
+
+    if not rows:
+        return empty, empty, np.empty(0, dtype=np.float32)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(scores)
+
+
+def build_lesson_neighbors(top_k=TOP_K, chunk_size=20000):
+    """Przebudowuje tabelę sąsiadów lekcji jednym przebiegiem po Progress"""
+    user_index, lesson_index = {}, {}
+    users, lessons = array('q'), array('q')
+
+    completions = Progress.objects.filter(
+        completed=True
+    ).values_list('user_id', 'lesson_id').order_by('user_id').iterator(chunk_size=chunk_size)
+
+    for user_id, lesson_id in completions:
+        users.append(user_index.setdefault(user_id, len(user_index)))
+        lessons.append(lesson_index.setdefault(lesson_id, len(lesson_index)))
+
+    rows, cols, scores = co_completion_neighbors(
+        np.frombuffer(users, dtype=np.int64),
+        np.frombuffer(lessons, dtype=np.int64),
+        len(lesson_index),
+        top_k=top_k
+    )
+
+    lesson_ids = list(lesson_index)
+    with transaction.atomic():
+        LessonNeighbor.objects.all().delete()
+        LessonNeighbor.objects.bulk_create(
+            (
+                LessonNeighbor(lesson_id=lesson_ids[i], neighbor_id=lesson_ids[j], score=float(s))
+                for i, j, s in zip(rows.tolist(), cols.tolist(), scores.tolist())
+            ),
+            batch_size=5000
+        )
+
+    logger.info(
+        f"Zbudowano sąsiedztwo {len(lesson_index)} lekcji z {len(users)} ukończeń "
+        f"{len(user_index)} użytkowników ({len(scores)} par)"
+    )
+    return {'users': len(user_index), 'lessons': len(lesson_index), 'pairs': len(scores)}
+
+
+def recommend_lessons(user, limit=10):
+    """Ocenia kandydatów z tabeli sąsiadów ukończonych lekcji (jedno zapytanie)"""
+    completed = Progress.objects.filter(user=user, completed=True).values('lesson_id')
+
+    return LessonNeighbor.objects.filter(
+        lesson_id__in=completed,
+        neighbor__is_active=True
+    ).exclude(
+        neighbor_id__in=completed
+    ).values(
+        'neighbor_id',
+        'neighbor__title',
+        'neighbor__course__title',
+        'neighbor__course__difficulty',
+        'neighbor__points',
+        'neighbor__duration_minutes'
+    ).annotate(
+        score=Sum('score')
+    ).order_by('-score')[:limit]
+
+
+def popular_lessons(user, limit=10):
+    """Najczęściej ukończone aktywne lekcje, których użytkownik jeszcze nie ukończył.
+
+    Zastępstwo dla użytkowników bez ukończeń (albo bez sąsiadów w tabeli);
+    ranking całego katalogu jest liczony raz na godzinę i trzymany w cache.
+    """
+    pool = cache.get(POPULAR_LESSONS_KEY)
+    if pool is None:
+        pool = list(
+            Lesson.objects.filter(is_active=True).annotate(
+                score=Count('progress', filter=Q(progress__completed=True))
+            ).values(
+                'id', 'title', 'course__title', 'course__difficulty', 'points', 'duration_minutes', 'score'
+            ).order_by('-score', 'id')[:POPULAR_LESSONS_POOL]
+        )
+        cache.set(POPULAR_LESSONS_KEY, pool, POPULAR_LESSONS_TIMEOUT)
+
+    completed = set(Progress.objects.filter(user_id=user.id, completed=True).values_list('lesson_id', flat=True))
+    return [
+        {
+            'neighbor_id': lesson['id'],
+            'neighbor__title': lesson['title'],
+            'neighbor__course__title': lesson['course__title'],
+            'neighbor__course__difficulty': lesson['course__difficulty'],
+            'neighbor__points': lesson['points'],
+            'neighbor__duration_minutes': lesson['duration_minutes'],
+            'score': lesson['score'],
+        }
+        for lesson in pool if lesson['id'] not in completed
+    ][:limit]
+
+
+def user_recommendations_key(user_id):
+    return f'analytics:recommendations:{user_id}'
+
+
+def invalidate_user_recommendations(user_id):
+    """Usuwa przeliczone nocą rekomendacje użytkownika"""
+    cache.delete(user_recommendations_key(user_id))
+
+
+def uuid_ranges(chunks):
+    """Dzieli przestrzeń UUID na `chunks` równych przedziałów [od, do)"""
+    step = (1 << 128) // chunks
+    bounds = [str(uuid.UUID(int=i * step)) for i in range(chunks)]
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:] + [None])]
+
+
+def score_users_in_range(id_from, id_to=None, limit=10, chunk_size=5000):
+    """Ocenia rekomendacje uczniów z przedziału ID i zapisuje je w cache.
+
+    Tabela sąsiadów jest wczytywana raz, a ukończenia uczniów czytane
+    strumieniowo (.iterator()) i grupowane po użytkowniku.
+    """
+    neighbors = defaultdict(list)
+    for lesson_id, neighbor_id, score in LessonNeighbor.objects.filter(
+        neighbor__is_active=True
+    ).values_list('lesson_id', 'neighbor_id', 'score').iterator(chunk_size=chunk_size):
+        neighbors[lesson_id].append((neighbor_id, score))
+
+    completions = Progress.objects.filter(
+        completed=True,
+        user__role='student',
+        user__is_active=True,
+        user_id__gte=id_from
+    )
+    if id_to is not None:
+        completions = completions.filter(user_id__lt=id_to)
+    completions = completions.values_list('user_id', 'lesson_id').order_by('user_id')
+
+    users = 0
+    batch = {}
+    for user_id, rows in groupby(completions.iterator(chunk_size=chunk_size), key=lambda row: row[0]):
+        completed = {lesson_id for _, lesson_id in rows}
+        scores = Counter()
+        for lesson_id in completed:
+            for neighbor_id, score in neighbors.get(lesson_id, ()):
+                if neighbor_id not in completed:
+                    scores[neighbor_id] += score
+
+        batch[user_recommendations_key(user_id)] = [
+            (str(lesson_id), round(score, 4)) for lesson_id, score in scores.most_common(limit)
+        ]
+        users += 1
+        if len(batch) >= 500:
+            cache.set_many(batch, RECOMMENDATIONS_CACHE_TIMEOUT)
+            batch = {}
+
+    if batch:
+        cache.set_many(batch, RECOMMENDATIONS_CACHE_TIMEOUT)
+    return users
+
+
+def cached_recommendations(user, limit=10):
+    """Zwraca rekomendacje przeliczone nocą (albo None, gdy ich brak w cache)"""
+    scored = cache.get(user_recommendations_key(user.id))
+    if scored is None:
+        return None
+
+    lessons = Lesson.objects.select_related('course').in_bulk([lesson_id for lesson_id, _ in scored[:limit]])
+    result = []
+    for lesson_id, score in scored[:limit]:
+        lesson = lessons.get(uuid.UUID(lesson_id))
+        if lesson is None or not lesson.is_active:
+            continue
+        result.append({
+            'neighbor_id': lesson.id,
+            'neighbor__title': lesson.title,
+            'neighbor__course__title': lesson.course.title,
+            'neighbor__course__difficulty': lesson.course.difficulty,
+            'neighbor__points': lesson.points,
+            'neighbor__duration_minutes': lesson.duration_minutes,
+            'score': score,
+        })
+    return result
@@ -0,0 +1,112 @@
+# backend/analytics/retention.py
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def purge_in_batches(model, cutoff, time_field='created_at', batch_size=5000, pause=0.1,
+                     max_batches=None, checkpoint_key=None):
+    """Usuwa wiersze starsze niż `cutoff` paczkami po `batch_size`.
+
+    Każda paczka to osobne polecenie DELETE (własna krótka transakcja, bez
+    ładowania obiektów przez Collector), a między paczkami następuje pauza
+    `pause` sekund, która ogranicza obciążenie I/O. Przerwane zadanie wznawia
+    się od miejsca przerwania: punkt kontrolny z datą graniczną i licznikiem
+    jest zapisywany w cache pod `checkpoint_key`.
+    """
+    checkpoint = cache.get(checkpoint_key) if checkpoint_key else None
+    if checkpoint:
+        cutoff = parse_datetime(checkpoint['cutoff'])
+        deleted = checkpoint['deleted']
+        logger.info(f"Wznawiam czyszczenie {model._meta.db_table} (usunięto już {deleted})")
+    else:
+        deleted = 0
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    column = connection.ops.quote_name(model._meta.get_field(time_field).column)
+    sql = (
+        f'DELETE FROM {table} WHERE {pk} IN ('
+        f'SELECT {pk} FROM {table} WHERE {column} < %s ORDER BY {column} LIMIT %s)'
+    )
+    params = [connection.ops.adapt_datetimefield_value(cutoff), batch_size]
+
+    start = time.perf_counter()
+    batches = 0
+    run_deleted = 0
+    finished = False
+    while max_batches is None or batches < max_batches:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            count = cursor.rowcount
+        batches += 1
+        run_deleted += count
+        deleted += count
+
+        if checkpoint_key:
+            cache.set(checkpoint_key, {'cutoff': cutoff.isoformat(), 'deleted': deleted}, CHECKPOINT_TIMEOUT)
+
+        if count < batch_size:
+            finished = True
+            if checkpoint_key:
+                cache.delete(checkpoint_key)
+            break
+
+        if batches % 100 == 0:
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"{model._meta.db_table}: usunięto {run_deleted} wierszy "
+                f"({run_deleted / elapsed:.0f} wierszy/s)"
+            )
+        time.sleep(pause)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'deleted': deleted,
+        'batches': batches,
+        'duration': round(elapsed, 3),
+        'rows_per_sec': round(run_deleted / elapsed, 1) if elapsed else 0,
+        'finished': finished,
+    }
+
+
+def purge_activity_logs(days=None, batch_size=None, pause=None, max_batches=None):
+    """Usuwa logi aktywności starsze niż okres retencji.
+
+    Gdy tabela jest partycjonowana miesięcznie, najpierw całe wygasłe
+    partycje są odłączane i usuwane (operacja na metadanych). Pozostałe
+    wygasłe wiersze - z miesiąca granicznego i z partycji domyślnej - usuwa
+    zwykły DELETE paczkami, który bez partycji obsługuje całą tabelę.
+    """
+    from api.models import ActivityLog
+
+    days = days or settings.ACTIVITY_LOG_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+
+    dropped = None
+    if connection.vendor == 'postgresql':
+        from api.partitioning import drop_partitions_before, is_partitioned
+
+        if is_partitioned():
+            dropped = drop_partitions_before(cutoff)
+
+    result = purge_in_batches(
+        ActivityLog,
+        cutoff,
+        batch_size=batch_size or settings.RETENTION_BATCH_SIZE,
+        pause=settings.RETENTION_BATCH_PAUSE if pause is None else pause,
+        max_batches=max_batches,
+        checkpoint_key='retention:activity_logs'
+    )
+    if dropped is not None:
+        result['partitions_dropped'] = dropped
+    return result
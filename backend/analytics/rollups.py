@@ -0,0 +1,59 @@
+# backend/analytics/rollups.py
+import uuid
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+from .models import DailyActivity
+
+ACTIVITY_RANGES = (7, 30, 365)
+
+_UPSERT_SQL = f'''
+    INSERT INTO {DailyActivity._meta.db_table}
+        (id, user_id, date, lessons_completed, points_earned, score_sum)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (user_id, date) DO UPDATE SET
+        lessons_completed = {DailyActivity._meta.db_table}.lessons_completed + EXCLUDED.lessons_completed,
+        points_earned = {DailyActivity._meta.db_table}.points_earned + EXCLUDED.points_earned,
+        score_sum = {DailyActivity._meta.db_table}.score_sum + EXCLUDED.score_sum
+'''
+
+
+def _prep(field_name, value):
+    return DailyActivity._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+
+def record_daily_activity(user_id, day, lessons=0, points=0, score=0.0):
+    """Dodaje przyrosty do dziennego podsumowania (jedno zapytanie, bez wyścigów)"""
+    with connection.cursor() as cursor:
+        cursor.execute(_UPSERT_SQL, [
+            _prep('id', uuid.uuid4()),
+            _prep('user', user_id),
+            _prep('date', day),
+            lessons,
+            points,
+            score,
+        ])
+
+
+def activity_histogram(user, days=7):
+    """Zwraca aktywność z ostatnich `days` dni (jeden odczyt zakresu indeksu)"""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+
+    rows = {
+        row['date']: row
+        for row in DailyActivity.objects.filter(
+            user=user, date__gte=start, date__lte=today
+        ).values('date', 'lessons_completed', 'points_earned', 'score_sum')
+    }
+
+    activity = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        row = rows.get(day)
+        activity.append({
+            'date': day.isoformat(),
+            'lessons_completed': row['lessons_completed'] if row else 0,
+            'points_earned': row['points_earned'] if row else 0,
+        })
+    return activity
@@ -4,6 +4,7 @@ from .models import UserProgress, TaskStats
 
 class UserProgressSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
+    average_score = serializers.FloatField(read_only=True)
     
     class Meta:
         model = UserProgress
@@ -21,4 +22,10 @@ class TaskStatsSerializer(serializers.ModelSerializer):
     def get_success_rate(self, obj):
         if obj.attempts == 0:
             return 0
-        return round((obj.successes / obj.attempts) * 100, 2)
\ No newline at end of file
+        return round((obj.successes / obj.attempts) * 100, 2)
+
+class TaskAttemptSerializer(serializers.Serializer):
+    """Pojedyncza próba rozwiązania zadania (wejście endpointu zbiorczego)"""
+    task_name = serializers.CharField(max_length=255)
+    success = serializers.BooleanField()
+    time = serializers.FloatField(min_value=0)
@@ -0,0 +1,54 @@
+# backend/analytics/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from accounts.signals import points_awarded
+from api.models import Progress
+from api.signals import progress_changed
+from .counters import apply_points, apply_progress_delta
+from .dashboard import invalidate_dashboard
+from .recommender import invalidate_user_recommendations
+from .rollups import record_daily_activity
+
+
+@receiver(post_save, sender=Progress)
+@receiver(post_delete, sender=Progress)
+def invalidate_progress_caches(sender, instance, **kwargs):
+    """Unieważnia cache dashboardu i rekomendacji po zmianie postępów użytkownika"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_dashboard(user_id))
+    transaction.on_commit(lambda: invalidate_user_recommendations(user_id))
+
+
+@receiver(progress_changed)
+def invalidate_caches_on_progress_changed(sender, user_id, **kwargs):
+    """Jak wyżej, dla zapisów z pominięciem save() (upsert w api.progress)"""
+    transaction.on_commit(lambda: invalidate_dashboard(user_id))
+    transaction.on_commit(lambda: invalidate_user_recommendations(user_id))
+
+
+@receiver(progress_changed)
+def update_daily_activity(sender, user_id, completed_at, completed_delta, points_delta, score_delta, **kwargs):
+    """Aktualizuje dzienne podsumowanie w tej samej transakcji co zapis postępu"""
+    if completed_at is None:
+        return
+    record_daily_activity(
+        user_id,
+        timezone.localdate(completed_at),
+        lessons=completed_delta,
+        points=points_delta,
+        score=score_delta,
+    )
+
+
+@receiver(progress_changed)
+def update_progress_counters(sender, user_id, completed_delta, score_delta, **kwargs):
+    """Aktualizuje liczniki UserProgress w tej samej transakcji co zapis postępu"""
+    apply_progress_delta(user_id, completed_delta, score_delta)
+
+
+@receiver(points_awarded)
+def update_points_counters(sender, user_ids, points, **kwargs):
+    """Przenosi przyznane punkty i poziom do UserProgress"""
+    apply_points(user_ids, points)
@@ -1,40 +1,85 @@
 # backend/analytics/tasks.py
-from celery import shared_task
-from django.utils import timezone
-from datetime import timedelta
+from celery import chord, group, shared_task
 import logging
+import math
+import time
 
 logger = logging.getLogger(__name__)
 
 @shared_task
 def calculate_all_recommendations():
-    """Oblicza rekomendacje dla wszystkich użytkowników"""
+    """Przelicza sąsiedztwo lekcji i rozdziela ocenę uczniów na workery"""
+    from django.conf import settings
     from accounts.models import CustomUser
+    from .recommender import build_lesson_neighbors, uuid_ranges
     
-    users = CustomUser.objects.filter(role='student', is_active=True)
+    started_at = time.time()
+    neighbors = build_lesson_neighbors()
     
-    for user in users:
-        try:
-            calculate_user_recommendations(user)
-        except Exception as e:
-            logger.error(f"Błąd przy obliczaniu rekomendacji dla {user.username}: {e}")
+    students = CustomUser.objects.filter(role='student', is_active=True).count()
+    chunks = max(1, math.ceil(students / settings.RECOMMENDATIONS_CHUNK_SIZE))
     
-    logger.info(f"Obliczono rekomendacje dla {users.count()} użytkowników")
+    header = group(
+        calculate_recommendations_chunk.s(index, id_from, id_to)
+        for index, (id_from, id_to) in enumerate(uuid_ranges(chunks))
+    )
+    chord(header)(summarize_recommendations.s(started_at, neighbors))
+    
+    logger.info(f"Rozdzielono ocenę {students} uczniów na {chunks} części")
+    return {'students': students, 'chunks': chunks}
+
 
+@shared_task
+def calculate_recommendations_chunk(index, id_from, id_to):
+    """Ocenia rekomendacje uczniów z jednego przedziału ID"""
+    from .recommender import score_users_in_range
+    
+    start = time.perf_counter()
+    users = score_users_in_range(id_from, id_to)
+    
+    return {
+        'chunk': index,
+        'users': users,
+        'duration': round(time.perf_counter() - start, 3)
+    }
 
-def calculate_user_recommendations(user):
-    """Oblicza rekomendacje dla pojedynczego użytkownika"""
-    # Logika rekomendacji - można rozbudować o ML
-    pass
+
+@shared_task
+def summarize_recommendations(results, started_at, neighbors):
+    """Raportuje czasy poszczególnych części i sumy po zakończeniu nocnego zadania"""
+    results = sorted(results, key=lambda result: result['chunk'])
+    for result in results:
+        logger.info(
+            f"Część {result['chunk']}: {result['users']} uczniów w {result['duration']:.2f} s"
+        )
+    
+    summary = {
+        'chunks': len(results),
+        'users': sum(result['users'] for result in results),
+        'lessons': neighbors['lessons'],
+        'pairs': neighbors['pairs'],
+        'slowest_chunk': max((result['duration'] for result in results), default=0),
+        'total_duration': round(time.time() - started_at, 3)
+    }
+    
+    logger.info(
+        f"Obliczono rekomendacje dla {summary['users']} użytkowników "
+        f"({summary['chunks']} części, {summary['total_duration']:.2f} s)"
+    )
+    return summary
 
 
 @shared_task
 def cleanup_old_activity_logs():
-    """Usuwa stare logi aktywności"""
-    from api.models import ActivityLog
+    """Usuwa stare logi aktywności paczkami (z pauzami i wznawianiem)"""
+    from .retention import purge_activity_logs
     
-    cutoff_date = timezone.now() - timedelta(days=90)
-    deleted_count = ActivityLog.objects.filter(created_at__lt=cutoff_date).delete()[0]
+    result = purge_activity_logs()
     
-    logger.info(f"Usunięto {deleted_count} starych logów aktywności")
-    return deleted_count
\ No newline at end of file
+    if result.get('partitions_dropped') is not None:
+        logger.info(f"Usunięto partycje logów aktywności: {result['partitions_dropped']}")
+    logger.info(
+        f"Usunięto {result['deleted']} starych logów aktywności "
+        f"({result['batches']} paczek, {result['rows_per_sec']} wierszy/s)"
+    )
+    return result['deleted']
@@ -0,0 +1,44 @@
+# backend/analytics/tests.py
+from datetime import timedelta
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts.models import CustomUser
+from api.models import Course, Lesson, Progress
+from analytics.dashboard import invalidate_dashboard
+from analytics.views import analytics_dashboard
+
+
+@pytest.fixture
+def student():
+    return CustomUser.objects.create_user(username='dashboard_student', password='pw', role='student')
+
+
+def seed_courses(user, count):
+    courses = Course.objects.bulk_create(Course(title=f'Kurs {i}') for i in range(count))
+    lessons = Lesson.objects.bulk_create(
+        Lesson(course=course, title=f'Lekcja {j}', points=10) for course in courses for j in range(3)
+    )
+    now = timezone.now()
+    Progress.objects.bulk_create(
+        Progress(user=user, lesson=lesson, completed=True, score=80, completed_at=now - timedelta(days=i % 7))
+        for i, lesson in enumerate(lessons[::2])
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('courses', [1, 50])
+def test_dashboard_query_count_does_not_depend_on_courses(student, courses, django_assert_num_queries):
+    seed_courses(student, courses)
+    invalidate_dashboard(student.id)
+    request = APIRequestFactory().get('/api/analytics/dashboard/')
+    force_authenticate(request, user=student)
+
+    with django_assert_num_queries(3):
+        response = analytics_dashboard(request)
+    assert response.status_code == 200
+    assert len(response.data['courses']) == courses
+
+    # Drugie wywołanie z cache nie dotyka bazy
+    with django_assert_num_queries(0):
+        analytics_dashboard(request)
@@ -5,18 +5,27 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Avg, Sum, Count, Q
 from .models import UserProgress, TaskStats
-from .serializers import UserProgressSerializer, TaskStatsSerializer
+from .serializers import UserProgressSerializer, TaskStatsSerializer, TaskAttemptSerializer
+from .dashboard import get_dashboard_data
+from .ingestion import record_task_attempts
+from .rollups import ACTIVITY_RANGES
+from .recommender import cached_recommendations, popular_lessons, recommend_lessons
 from accounts.models import CustomUser
 from api.models import Course, Lesson, Progress
 
+MAX_ATTEMPTS_PER_BATCH = 5000
+
+
 class UserProgressViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = UserProgressSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         user = self.request.user
-        if user.role in ['admin', 'teacher']:
+        if user.role == 'admin':
             return UserProgress.objects.all()
+        elif user.role == 'teacher':
+            return UserProgress.objects.filter(user__in=CustomUser.objects.students_of(user))
         return UserProgress.objects.filter(user=user)
 
 
@@ -29,6 +38,29 @@ class TaskStatsViewSet(viewsets.ReadOnlyModelViewSet):
         if user.role in ['admin', 'teacher']:
             return TaskStats.objects.all()
         return TaskStats.objects.filter(user=user)
+    
+    @action(detail=False, methods=['post'])
+    def record(self, request):
+        """Zapisuje paczkę prób zadań zalogowanego użytkownika"""
+        data = request.data.get('attempts') if isinstance(request.data, dict) else request.data
+        if not isinstance(data, list) or not data:
+            return Response(
+                {'error': 'Oczekiwano niepustej listy prób w polu attempts'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > MAX_ATTEMPTS_PER_BATCH:
+            return Response(
+                {'error': f'Maksymalnie {MAX_ATTEMPTS_PER_BATCH} prób w jednym żądaniu'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = TaskAttemptSerializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        
+        tasks = record_task_attempts(
+            dict(attempt, user_id=request.user.id) for attempt in serializer.validated_data
+        )
+        return Response({'recorded': len(data), 'tasks': tasks})
 
 
 @api_view(['GET'])
@@ -37,45 +69,18 @@ def analytics_dashboard(request):
     """Dashboard z analityką dla użytkownika"""
     user = request.user
     
-    # Podstawowe statystyki
-    completed = Progress.objects.filter(user=user, completed=True).count()
-    total_score = Progress.objects.filter(user=user).aggregate(
-        avg=Avg('score')
-    )['avg'] or 0
-    
-    # Statystyki kursów
-    courses_stats = []
-    for course in Course.objects.filter(is_active=True):
-        total_lessons = course.lessons.filter(is_active=True).count()
-        completed_lessons = Progress.objects.filter(
-            user=user,
-            lesson__course=course,
-            completed=True
-        ).count()
-        
-        courses_stats.append({
-            'course_id': course.id,
-            'course_title': course.title,
-            'total_lessons': total_lessons,
-            'completed_lessons': completed_lessons,
-            'progress_percentage': round((completed_lessons / total_lessons * 100) if total_lessons > 0 else 0, 2)
-        })
+    try:
+        days = int(request.query_params.get('days', 7))
+    except ValueError:
+        days = 7
+    if days not in ACTIVITY_RANGES:
+        return Response(
+            {'error': f'Dozwolone zakresy: {", ".join(map(str, ACTIVITY_RANGES))} dni'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    # Aktywność w czasie
-    from datetime import datetime, timedelta
-    today = datetime.now().date()
-    
-    activity_last_7_days = []
-    for i in range(7):
-        date = today - timedelta(days=i)
-        count = Progress.objects.filter(
-            user=user,
-            completed_at__date=date
-        ).count()
-        activity_last_7_days.append({
-            'date': date.isoformat(),
-            'lessons_completed': count
-        })
+    # Statystyki postępów, kursów i aktywności (cache per użytkownik)
+    data = get_dashboard_data(user, days)
     
     return Response({
         'user': {
@@ -85,13 +90,13 @@ def analytics_dashboard(request):
             'level': user.level
         },
         'stats': {
-            'completed_lessons': completed,
-            'average_score': round(total_score, 2),
+            'completed_lessons': data['completed_lessons'],
+            'average_score': data['average_score'],
             'total_points': user.points,
             'level': user.level
         },
-        'courses': courses_stats,
-        'activity': list(reversed(activity_last_7_days))
+        'courses': data['courses'],
+        'activity': data['activity']
     })
 
 
@@ -101,43 +106,29 @@ def recommendations(request):
     """Rekomendacje kursów dla użytkownika"""
     user = request.user
     
-    # Pobierz ukończone lekcje
-    completed_lessons = Progress.objects.filter(
-        user=user,
-        completed=True
-    ).values_list('lesson_id', flat=True)
-    
-    # Znajdź podobnych użytkowników (collaborative filtering)
-    similar_users = CustomUser.objects.filter(
-        role='student',
-        level__range=(user.level - 1, user.level + 1)
-    ).exclude(id=user.id)[:10]
-    
-    # Znajdź lekcje, które ukończyli podobni użytkownicy
-    recommended_lessons = Lesson.objects.filter(
-        progress__user__in=similar_users,
-        progress__completed=True,
-        is_active=True
-    ).exclude(
-        id__in=completed_lessons
-    ).annotate(
-        popularity=Count('progress')
-    ).order_by('-popularity')[:10]
+    # Wyniki nocnego zadania, a gdy ich brak - ocena z tabeli sąsiadów
+    lessons = cached_recommendations(user, limit=10)
+    if lessons is None:
+        lessons = recommend_lessons(user, limit=10)
+    based_on = 'Lekcje ukończone razem z Twoimi'
+    if not lessons:
+        # Brak ukończeń (albo sąsiadów) - najpopularniejsze lekcje jak wcześniej
+        lessons = popular_lessons(user, limit=10)
+        based_on = 'Najpopularniejsze lekcje'
     
     recommendations_data = []
-    for lesson in recommended_lessons:
+    for lesson in lessons:
         recommendations_data.append({
-            'lesson_id': lesson.id,
-            'lesson_title': lesson.title,
-            'course_title': lesson.course.title,
-            'difficulty': lesson.course.difficulty,
-            'points': lesson.points,
-            'duration_minutes': lesson.duration_minutes,
-            'popularity_score': lesson.popularity
+            'lesson_id': lesson['neighbor_id'],
+            'lesson_title': lesson['neighbor__title'],
+            'course_title': lesson['neighbor__course__title'],
+            'difficulty': lesson['neighbor__course__difficulty'],
+            'points': lesson['neighbor__points'],
+            'duration_minutes': lesson['neighbor__duration_minutes'],
+            'popularity_score': round(lesson['score'], 4)
         })
     
     return Response({
         'recommendations': recommendations_data,
-        'based_on': f'Poziom {user.level}, podobni użytkownicy'
+        'based_on': based_on
     })
-
@@ -0,0 +1,190 @@
+# Buforowany zapis logów aktywności
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+REDIS_BUFFER_KEY = 'activity_log:buffer'
+REDIS_FLUSH_LOCK_KEY = 'activity_log:flush_lock'
+FLUSH_LOCK_TIMEOUT = 60
+
+
+def _entry(user, action):
+    return {
+        'id': str(uuid.uuid4()),
+        'user_id': str(getattr(user, 'pk', user)),
+        'action': action,
+        'created_at': timezone.now().isoformat(),
+    }
+
+
+def write_entries(entries):
+    """Zapisuje wpisy jednym bulk_create (powtórzone wpisy są pomijane)"""
+    if not entries:
+        return 0
+    ActivityLog.objects.bulk_create(
+        [
+            ActivityLog(
+                id=entry['id'],
+                user_id=entry['user_id'],
+                action=entry['action'],
+                created_at=parse_datetime(entry['created_at'])
+            )
+            for entry in entries
+        ],
+        ignore_conflicts=True
+    )
+    return len(entries)
+
+
+class SyncWriter:
+    """Zapis bezpośrednio w żądaniu (testy, środowiska bez bufora)"""
+
+    def enqueue(self, entry):
+        write_entries([entry])
+
+    def flush(self):
+        return 0
+
+
+class MemoryBuffer:
+    """Bufor w pamięci procesu opróżniany przez wątek w tle (rozmiar lub czas)"""
+
+    def __init__(self, batch_size, flush_interval, autostart=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.autostart = autostart
+        self._entries = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def enqueue(self, entry):
+        self._entries.append(entry)
+        if self.autostart and self._pid != os.getpid():
+            self._start()
+        if len(self._entries) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        written = 0
+        with self._lock:
+            while self._entries:
+                batch = []
+                while self._entries and len(batch) < self.batch_size:
+                    batch.append(self._entries.popleft())
+                try:
+                    written += write_entries(batch)
+                except Exception as e:
+                    self._entries.extendleft(reversed(batch))
+                    logger.error(f"Błąd zapisu logów aktywności: {e}")
+                    break
+        return written
+
+    def _start(self):
+        # Po fork() (gunicorn, celery prefork) wątek trzeba uruchomić ponownie
+        self._pid = os.getpid()
+        threading.Thread(target=self._run, name='activity-log-flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+class RedisBuffer:
+    """Bufor w liście Redis opróżniany zadaniem Celery (wspólny dla procesów)"""
+
+    def __init__(self, batch_size, schedule_flush=True):
+        self.batch_size = batch_size
+        self.schedule_flush = schedule_flush
+
+    def enqueue(self, entry):
+        from config.redis import get_redis
+
+        length = get_redis().rpush(REDIS_BUFFER_KEY, json.dumps(entry))
+        # Co pełną paczkę (a nie tylko przy dokładnie jednej długości listy)
+        if self.schedule_flush and length % self.batch_size == 0:
+            from .tasks import flush_activity_log_buffer
+            flush_activity_log_buffer.delay()
+
+    def flush(self):
+        """Zapisuje bufor paczkami; naraz działa tylko jedno opróżnianie.
+
+        Bez blokady dwa równoległe opróżnienia (zadanie z beat i zadanie
+        z enqueue) czytałyby tę samą głowę listy, a drugie LTRIM usuwałoby
+        wpisy, których nikt nie zapisał. Blokada (SET NX PX z tokenem) jest
+        przedłużana przed każdym LTRIM; kto ją stracił, nie przycina listy.
+        """
+        from redis.exceptions import LockError
+        from config.redis import get_redis
+
+        client = get_redis()
+        lock = client.lock(REDIS_FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            return 0
+
+        written = 0
+        try:
+            while True:
+                raw = client.lrange(REDIS_BUFFER_KEY, 0, self.batch_size - 1)
+                if not raw:
+                    break
+                # Powtórzony zapis tych samych wpisów jest pomijany (stałe id, ignore_conflicts)
+                written += write_entries([json.loads(item) for item in raw])
+                lock.reacquire()
+                # Usuwamy dopiero po zapisie - ponowienie po awarii nie zgubi wpisów
+                client.ltrim(REDIS_BUFFER_KEY, len(raw), -1)
+                if len(raw) < self.batch_size:
+                    break
+        except LockError:
+            logger.warning("Utracono blokadę opróżniania bufora logów aktywności")
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+        return written
+
+
+_writer = None
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        backend = settings.ACTIVITY_LOG_BACKEND
+        if backend == 'sync':
+            _writer = SyncWriter()
+        elif backend == 'redis':
+            _writer = RedisBuffer(settings.ACTIVITY_LOG_BATCH_SIZE)
+        else:
+            _writer = MemoryBuffer(settings.ACTIVITY_LOG_BATCH_SIZE, settings.ACTIVITY_LOG_FLUSH_INTERVAL)
+    return _writer
+
+
+def log_activity(user, action):
+    """Rejestruje akcję użytkownika bez zapisu do bazy w ścieżce żądania"""
+    get_writer().enqueue(_entry(user, action))
+
+
+def flush_activity_logs():
+    """Zapisuje wszystkie zbuforowane wpisy (np. przy zamykaniu procesu)"""
+    if _writer is None:
+        return 0
+    return _writer.flush()
+
+
+atexit.register(flush_activity_logs)
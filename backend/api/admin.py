@@ -1,5 +1,9 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from .models import Course, Lesson, Progress, UserAchievement, ActivityLog
+from .progress import award_progress_points
+from .signals import send_progress_changed
 
 
 @admin.register(Course)
@@ -16,6 +20,31 @@ class LessonAdmin(admin.ModelAdmin):
 class ProgressAdmin(admin.ModelAdmin):
     list_display = ('user', 'lesson', 'completed', 'completed_at', 'score')
 
+    # Zmiany z panelu przechodzą przez progress_changed i punkty jak zapisy z API (podsumowania dzienne, liczniki)
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        previous = None
+        if change:
+            previous = Progress.objects.select_for_update().values_list(
+                'completed', 'score', 'completed_at'
+            ).get(pk=obj.pk)
+        if obj.completed and obj.completed_at is None:
+            obj.completed_at = timezone.now()
+        super().save_model(request, obj, form, change)
+        award_progress_points(obj.user_id, send_progress_changed(obj, previous))
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        previous = (obj.completed, obj.score, obj.completed_at)
+        super().delete_model(request, obj)
+        obj.completed = False
+        award_progress_points(obj.user_id, send_progress_changed(obj, previous))
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        for obj in queryset.select_related('lesson'):
+            self.delete_model(request, obj)
+
 
 @admin.register(UserAchievement)
 class UserAchievementAdmin(admin.ModelAdmin):
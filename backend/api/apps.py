@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from celery.signals import worker_shutdown
+        from . import signals  # noqa: F401 - rejestracja odbiorników
+        from .activity import flush_activity_logs
+
+        # Worker opróżnia bufor logów przed zamknięciem
+        worker_shutdown.connect(lambda **kwargs: flush_activity_logs(), weak=False)
@@ -0,0 +1,136 @@
+# Wersjonowany cache katalogu kursów i lekcji (ETag / Last-Modified)
+import hashlib
+import time
+import uuid
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Q, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+CATALOG_VERSION_KEY = 'api:catalog:version'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def bump_catalog_version():
+    """Nowa wersja katalogu: stare odpowiedzi przestają być trafiane i wygasają same"""
+    state = {'version': uuid.uuid4().hex, 'modified': int(time.time())}
+    cache.set(CATALOG_VERSION_KEY, state, None)
+    return state
+
+
+def get_catalog_state():
+    """Bieżąca wersja katalogu i chwila ostatniej zmiany (jeden odczyt z Redis)"""
+    state = cache.get(CATALOG_VERSION_KEY)
+    if state is None:
+        # add(): przy równoległym starcie wszystkie procesy dostaną tę samą wersję
+        state = {'version': uuid.uuid4().hex, 'modified': int(time.time())}
+        if not cache.add(CATALOG_VERSION_KEY, state, None):
+            state = cache.get(CATALOG_VERSION_KEY, state)
+    return state
+
+
+def path_hash(request):
+    return hashlib.md5(request.get_full_path().encode()).hexdigest()[:16]
+
+
+def catalog_cache_key(version, request, prefix='response'):
+    return f'api:catalog:{prefix}:{version}:{path_hash(request)}'
+
+
+def catalog_etag(version, request):
+    return f'"{version}-{path_hash(request)}"'
+
+
+def catalog_headers(response, etag, modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    # Klient może trzymać kopię, ale przed użyciem ją rewaliduje (304 bez treści)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class CatalogCacheMixin:
+    """Odpowiedzi list i szczegółów katalogu z cache per wersja katalogu i adres.
+
+    If-None-Match / If-Modified-Since zgodne z bieżącą wersją kończą się
+    odpowiedzią 304 bez zapytań do bazy. Zserializowane ciała JSON (także
+    kolejne strony i ?fields=) są trzymane w Redis jako gotowe bajty.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        state = get_catalog_state()
+        etag = catalog_etag(state['version'], request)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=state['modified'])
+        if not_modified is not None:
+            return catalog_headers(not_modified, etag, state['modified'])
+
+        # Przeglądarkowe API DRF i inne formaty idą zwykłą ścieżką
+        if request.accepted_renderer.format != 'json':
+            return catalog_headers(handler(request, *args, **kwargs), etag, state['modified'])
+
+        key = catalog_cache_key(state['version'], request)
+        body = cache.get(key)
+        if body is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = request.accepted_renderer.render(response.data, request.accepted_media_type, {})
+            cache.set(key, body, CATALOG_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type=request.accepted_renderer.media_type)
+        return catalog_headers(response, etag, state['modified'])
+
+
+def build_course_tree():
+    """Całe drzewo katalogu dwoma zapytaniami: kursy z licznikami i jeden prefetch aktywnych lekcji"""
+    from .models import Course, Lesson
+    from .renderers import ORJSONRenderer
+    from .serializers import CourseTreeSerializer
+
+    active = Q(lessons__is_active=True)
+    courses = Course.objects.filter(is_active=True).annotate(
+        lesson_count=Count('lessons', filter=active),
+        total_points=Coalesce(Sum('lessons__points', filter=active), 0),
+        total_minutes=Coalesce(Sum('lessons__duration_minutes', filter=active), 0),
+    ).prefetch_related(
+        Prefetch(
+            'lessons',
+            queryset=Lesson.objects.filter(is_active=True).order_by('title', 'id'),
+            to_attr='active_lessons'
+        )
+    ).order_by('title', 'id')
+    return ORJSONRenderer().render(CourseTreeSerializer(courses, many=True).data)
+
+
+def _chunks(body):
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[start:start + STREAM_CHUNK_SIZE]
+
+
+def course_tree_response(request):
+    """Drzewo katalogu: 304 dla aktualnej kopii klienta, w przeciwnym razie
+    bajty zserializowane raz na wersję katalogu, wysyłane strumieniowo"""
+    state = get_catalog_state()
+    etag = catalog_etag(state['version'], request)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=state['modified'])
+    if not_modified is not None:
+        return catalog_headers(not_modified, etag, state['modified'])
+
+    key = f'api:catalog:tree:{state["version"]}'
+    body = cache.get(key)
+    if body is None:
+        body = build_course_tree()
+        cache.set(key, body, CATALOG_CACHE_TIMEOUT)
+
+    response = StreamingHttpResponse(_chunks(body), content_type='application/json')
+    response['Content-Length'] = len(body)
+    return catalog_headers(response, etag, state['modified'])
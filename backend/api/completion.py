@@ -0,0 +1,97 @@
+# Ukończenie lekcji: postęp, punkty i log aktywności w jednej transakcji
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import CustomUser
+from .activity import _entry, write_entries
+from .models import IdempotencyKey
+from .progress import complete_progress
+
+_TABLE = IdempotencyKey._meta.db_table
+
+_CLAIM_SQL = f'''
+    INSERT INTO {_TABLE} (id, user_id, key, fingerprint, created_at)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (user_id, key) DO NOTHING
+    RETURNING id
+'''
+
+
+class IdempotencyConflict(Exception):
+    """Klucz idempotencji użyty wcześniej dla innego żądania"""
+
+
+def _prep(field_name, value):
+    return IdempotencyKey._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+
+def _claim(user_id, key, fingerprint):
+    """Rezerwuje klucz; zwraca id rekordu albo None, gdy klucz był już użyty.
+
+    Równoległe żądanie z tym samym kluczem czeka na INSERT pierwszego
+    i po jego zatwierdzeniu dostaje None (zapisana odpowiedź jest już w bazie).
+    """
+    record_id = uuid.uuid4()
+    with connection.cursor() as cursor:
+        cursor.execute(_CLAIM_SQL, [
+            _prep('id', record_id),
+            _prep('user', user_id),
+            key,
+            fingerprint,
+            _prep('created_at', timezone.now()),
+        ])
+        return record_id if cursor.fetchone() else None
+
+
+def complete_lesson(user_id, lesson, score=0.0, idempotency_key=None):
+    """Ukończenie lekcji przez użytkownika.
+
+    Upsert postępu, przyznanie punktów (tylko przy pierwszym ukończeniu)
+    i wpis w logu aktywności idą w jednej transakcji. Ponowienie z tym
+    samym kluczem idempotencji zwraca zapisaną odpowiedź bez ponownego
+    zapisu. Zwraca (status, dane, czy_powtórzone).
+    """
+    fingerprint = f'lesson_complete:{lesson.pk}:{score}'
+    with transaction.atomic():
+        if idempotency_key:
+            record_id = _claim(user_id, idempotency_key, fingerprint)
+            if record_id is None:
+                record = IdempotencyKey.objects.values('fingerprint', 'status_code', 'response').get(
+                    user_id=user_id, key=idempotency_key
+                )
+                if record['fingerprint'] != fingerprint:
+                    raise IdempotencyConflict(idempotency_key)
+                return record['status_code'], record['response'], True
+
+        progress, first_completion = complete_progress(user_id, lesson, score)
+        points_earned = lesson.points if first_completion and lesson.points else 0
+        if points_earned:
+            [(_, total_points, level, _, _, _)] = CustomUser.objects.award_points([user_id], points_earned)
+        else:
+            total_points, level = CustomUser.objects.values_list('points', 'level').get(pk=user_id)
+        write_entries([_entry(user_id, 'lesson_complete')])
+
+        data = {
+            'message': 'Lekcja ukończona!',
+            'lesson': str(lesson.pk),
+            'first_completion': first_completion,
+            'score': progress.score,
+            'points_earned': points_earned,
+            'total_points': total_points,
+            'level': level,
+        }
+        status_code = 201 if first_completion else 200
+        if idempotency_key:
+            IdempotencyKey.objects.filter(pk=record_id).update(status_code=status_code, response=data)
+    return status_code, data, False
+
+
+def purge_idempotency_keys(max_age=None):
+    """Usuwa klucze starsze niż IDEMPOTENCY_KEY_TTL (w sekundach)"""
+    max_age = max_age if max_age is not None else settings.IDEMPOTENCY_KEY_TTL
+    deleted, _ = IdempotencyKey.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=max_age)
+    ).delete()
+    return deleted
@@ -0,0 +1,153 @@
+# Szybka ścieżka serializacji list tylko do odczytu (wiersze z .values())
+import re
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .mixins import SparseFieldsetMixin, requested_fields
+
+_DISPLAY = re.compile(r'^get_(\w+)_display$')
+_plans = {}
+
+
+def _datetime(value):
+    """Jak DateTimeField DRF: bieżąca strefa czasowa, ISO 8601, UTC jako 'Z'"""
+    if settings.USE_TZ:
+        value = value.astimezone(timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _converter(field):
+    """Funkcja przekształcająca wartość kolumny tak jak pole serializera (None = bez zmian)"""
+    if isinstance(field, serializers.DateTimeField):
+        if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() != 'iso-8601':
+            return field.to_representation
+        return _datetime
+    if isinstance(field, serializers.DateField):
+        return field.to_representation
+    if isinstance(field, (serializers.UUIDField, serializers.DecimalField)):
+        return field.to_representation
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, (
+        serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+        serializers.JSONField, serializers.ModelField, serializers.ReadOnlyField,
+        serializers.PrimaryKeyRelatedField,
+    )):
+        return None
+    raise ImproperlyConfigured(f'Pole {field.field_name} ({type(field).__name__}) nie ma szybkiej ścieżki')
+
+
+class ValuesPlan:
+    """Plan budowy odpowiedzi serializera bezpośrednio z wierszy .values().
+
+    Plan powstaje z pól istniejącego ModelSerializer, więc nazwy i format
+    wyjścia zostają te same (zgodność sprawdza verify_contract). Obsługuje
+    kolumny modelu, klucze obce (jako pk) i get_<pole>_display; pola
+    wyliczane i zagnieżdżone serializery zgłaszają ImproperlyConfigured.
+    """
+
+    def __init__(self, serializer_class, names=None):
+        model = serializer_class.Meta.model
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (names is not None and name not in names):
+                continue
+            self.fields.append((name, *self._column(model, field)))
+        self.columns = list(dict.fromkeys(column for _, column, _ in self.fields))
+
+    @staticmethod
+    def _column(model, field):
+        display = _DISPLAY.match(field.source)
+        try:
+            model_field = model._meta.get_field(display.group(1) if display else field.source)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(f'Pole {field.field_name} nie odpowiada kolumnie modelu {model.__name__}')
+        if not model_field.concrete or model_field.many_to_many:
+            raise ImproperlyConfigured(f'Pole {field.field_name} nie odpowiada kolumnie modelu {model.__name__}')
+
+        if display:
+            choices = {value: str(label) for value, label in model_field.flatchoices}
+            return model_field.attname, lambda value: choices.get(value, value)
+        return model_field.attname, _converter(field)
+
+    @classmethod
+    def for_serializer(cls, serializer_class, names=None):
+        if (serializer_class, None) not in _plans:
+            _plans[serializer_class, None] = cls(serializer_class)
+        plan = _plans[serializer_class, None]
+        if names is None:
+            return plan
+        # Klucz tylko ze znanych pól - nieznane nazwy z ?fields= nie mnożą planów
+        key = (serializer_class, frozenset(names) & frozenset(name for name, _, _ in plan.fields))
+        if key not in _plans:
+            _plans[key] = cls(serializer_class, key[1])
+        return _plans[key]
+
+    def row(self, values):
+        data = {}
+        for name, column, convert in self.fields:
+            value = values[column]
+            data[name] = value if convert is None or value is None else convert(value)
+        return data
+
+    def rows(self, values):
+        return [self.row(item) for item in values]
+
+
+def verify_contract(serializer_class, queryset):
+    """Porównuje szybką ścieżkę (ValuesPlan + orjson) z ModelSerializer + JSONRenderer po zdekodowaniu JSON.
+
+    Zwraca listę różnic (pusta lista = ten sam kontrakt).
+    """
+    import json
+    from rest_framework.renderers import JSONRenderer
+    from .renderers import ORJSONRenderer
+
+    plan = ValuesPlan.for_serializer(serializer_class)
+    queryset = queryset.order_by('pk')
+    expected = json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data))
+    actual = json.loads(ORJSONRenderer().render(plan.rows(queryset.values(*plan.columns))))
+
+    differences = []
+    if len(expected) != len(actual):
+        differences.append(f'liczba wierszy {len(actual)} != {len(expected)}')
+    for left, right in zip(expected, actual):
+        if list(left) != list(right):
+            differences.append(f'pola {list(right)} != {list(left)}')
+        for name in left:
+            if left[name] != right.get(name):
+                differences.append(f'{name}: {right.get(name)!r} != {left[name]!r}')
+        if differences:
+            break
+    return differences
+
+
+class FastListMixin:
+    """Lista budowana z .values() z pominięciem ModelSerializer (opt-in dla widoków tylko do odczytu).
+
+    Respektuje filtry, stronicowanie i ?fields= (gdy serializer ma
+    SparseFieldsetMixin - jak w pozostałych akcjach); pola serializera muszą
+    dać się odwzorować na kolumny (patrz ValuesPlan).
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        names = requested_fields(request) if issubclass(serializer_class, SparseFieldsetMixin) else None
+        plan = ValuesPlan.for_serializer(serializer_class, names)
+        # Stronicowanie po kluczu potrzebuje kolumn klucza w wierszach
+        ordering = getattr(self.paginator, 'ordering', ())
+        ordering = [field.lstrip('-') for field in ([ordering] if isinstance(ordering, str) else ordering)]
+        queryset = self.filter_queryset(self.get_queryset()).values(*dict.fromkeys(plan.columns + ordering))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.rows(page))
+        return Response(plan.rows(queryset))
@@ -0,0 +1,73 @@
+# backend/api/management/commands/benchmark_activity_log.py
+# Uruchomienie: python manage.py benchmark_activity_log --events 5000 --backends sync memory redis
+
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from accounts.models import CustomUser
+from api.activity import MemoryBuffer, RedisBuffer, SyncWriter, _entry
+from api.models import ActivityLog
+
+
+class Command(BaseCommand):
+    help = 'Mierzy opóźnienie rejestracji i przepustowość zapisu logów aktywności'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=5000, help='Liczba zdarzeń na backend')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rozmiar paczki bufora')
+        parser.add_argument(
+            '--backends', nargs='+', default=['sync', 'memory', 'redis'],
+            choices=['sync', 'memory', 'redis'], help='Backendy do porównania'
+        )
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.create_user(
+            username=f'bench_{random.randint(0, 10 ** 9)}', password='bench'
+        )
+        try:
+            for backend in options['backends']:
+                self.run(backend, user, options['events'], options['batch_size'])
+        finally:
+            # Usunięcie użytkownika kaskadowo usuwa jego logi
+            user.delete()
+
+    def make_writer(self, backend, batch_size):
+        if backend == 'sync':
+            return SyncWriter()
+        if backend == 'redis':
+            # Bez zadania Celery - opróżnianie mierzymy osobno
+            return RedisBuffer(batch_size, schedule_flush=False)
+        # Bez wątku w tle - opróżnianie mierzymy osobno
+        return MemoryBuffer(batch_size, flush_interval=60, autostart=False)
+
+    def run(self, backend, user, events, batch_size):
+        writer = self.make_writer(backend, batch_size)
+        before = ActivityLog.objects.filter(user=user).count()
+
+        latencies = []
+        start = time.perf_counter()
+        for i in range(events):
+            entry = _entry(user, f'benchmark_{i % 10}')
+            t0 = time.perf_counter()
+            writer.enqueue(entry)
+            latencies.append(time.perf_counter() - t0)
+        enqueue_elapsed = time.perf_counter() - start
+
+        t0 = time.perf_counter()
+        writer.flush()
+        flush_elapsed = time.perf_counter() - t0
+        total = enqueue_elapsed + flush_elapsed
+
+        written = ActivityLog.objects.filter(user=user).count() - before
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(self.style.SUCCESS(f'[{backend}]'))
+        self.stdout.write(
+            f'  rejestracja: mediana {statistics.median(latencies) * 1e6:.0f} µs, '
+            f'p99 {p99 * 1e6:.0f} µs'
+        )
+        self.stdout.write(
+            f'  zapisano {written}/{events} wierszy w {total:.2f}s '
+            f'({written / total:.0f} wierszy/s, opróżnienie bufora {flush_elapsed:.2f}s)'
+        )
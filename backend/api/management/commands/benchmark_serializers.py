@@ -0,0 +1,96 @@
+# backend/api/management/commands/benchmark_serializers.py
+# Uruchomienie: python manage.py benchmark_serializers --rows 2000 --repeat 5
+
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from accounts.models import CustomUser
+from api.fast import ValuesPlan, verify_contract
+from api.models import Course, Lesson, Progress
+from api.renderers import ORJSONRenderer
+from api.serializers import CourseSerializer, LessonSerializer, ProgressSerializer
+from integrations.models import IntegrationEvent, IntegrationTask, SystemA, SystemB
+from integrations.serializers import IntegrationEventSerializer
+
+
+class Command(BaseCommand):
+    help = 'Zgodność i przepustowość szybkiej ścieżki list (ValuesPlan + orjson) względem ModelSerializer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Liczba wierszy na endpoint')
+        parser.add_argument('--repeat', type=int, default=5, help='Liczba powtórzeń pomiaru')
+
+    def handle(self, *args, **options):
+        suffix = random.randint(0, 10 ** 9)
+        rows = options['rows']
+        user = CustomUser.objects.create_user(username=f'bench_{suffix}', password='bench', role='student')
+        course = Course.objects.create(title=f'Benchmark {suffix}')
+        system_a = SystemA.objects.create(name=f'Benchmark A {suffix}', api_endpoint='http://a.example.com', api_key='-')
+        system_b = SystemB.objects.create(name=f'Benchmark B {suffix}', api_endpoint='http://b.example.com', api_key='-')
+        try:
+            courses = Course.objects.bulk_create(
+                Course(title=f'Kurs {suffix} {i}', description='Opis kursu ' * 5) for i in range(rows)
+            )
+            lessons = Lesson.objects.bulk_create(
+                Lesson(course=course, title=f'Lekcja {i}', points=i % 50) for i in range(rows)
+            )
+            now = timezone.now()
+            Progress.objects.bulk_create(
+                Progress(user=user, lesson=lesson, completed=i % 2 == 0,
+                         completed_at=now if i % 2 == 0 else None, score=i % 100 + 0.5)
+                for i, lesson in enumerate(lessons)
+            )
+            task = IntegrationTask.objects.create(
+                name=f'Benchmark {suffix}', description='', system_a=system_a, system_b=system_b, direction='a_to_b'
+            )
+            IntegrationEvent.objects.bulk_create(
+                IntegrationEvent(task=task, event_type='sync_complete', message=f'Zdarzenie {i}',
+                                 error_details={'rows': i}, records_synced=i, sync_duration=i / 10)
+                for i in range(rows)
+            )
+
+            cases = [
+                ('courses', CourseSerializer, Course.objects.filter(pk__in=[c.pk for c in courses])),
+                ('lessons', LessonSerializer, Lesson.objects.filter(course=course)),
+                ('progress', ProgressSerializer, Progress.objects.filter(user_id=user.id)),
+                ('integration events', IntegrationEventSerializer, IntegrationEvent.objects.filter(task=task)),
+            ]
+            for name, serializer_class, queryset in cases:
+                differences = verify_contract(serializer_class, queryset)
+                if differences:
+                    raise CommandError(f'{name}: szybka ścieżka zmienia kontrakt API: {differences[:3]}')
+                self.measure(name, serializer_class, queryset, options['repeat'])
+        finally:
+            CustomUser.objects.filter(pk=user.pk).delete()
+            Course.objects.filter(title__startswith=f'Kurs {suffix} ').delete()
+            course.delete()
+            system_a.delete()
+            system_b.delete()
+
+    def measure(self, name, serializer_class, queryset, repeat):
+        plan = ValuesPlan.for_serializer(serializer_class)
+
+        def serializer_path():
+            return JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+
+        def fast_path():
+            return ORJSONRenderer().render(plan.rows(queryset.values(*plan.columns)))
+
+        slow, count = self.best_time(serializer_path, repeat)
+        fast, _ = self.best_time(fast_path, repeat)
+        self.stdout.write(
+            f'{name}: ModelSerializer + JSONRenderer {count / slow:,.0f} obiektów/s, '
+            f'ValuesPlan + orjson {count / fast:,.0f} obiektów/s ({slow / fast:.1f}x)'
+        )
+
+    @staticmethod
+    def best_time(render, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body.count(b'"id"')
@@ -0,0 +1,31 @@
+# backend/api/management/commands/dedupe_progress.py
+# Uruchomienie: python manage.py dedupe_progress
+# Przed migracją dodającą unikalność (user, lesson) w tabeli postępów, a po niej
+# przeliczenie podsumowań:
+#   python manage.py dedupe_progress && python manage.py migrate
+#   python manage.py rebuild_user_progress && python manage.py backfill_daily_activity --reset
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from api.models import Progress
+from api.progress import dedupe_progress
+
+
+class Command(BaseCommand):
+    help = 'Scala zdublowane postępy (user, lesson): najlepszy wynik, najwcześniejsze ukończenie'
+
+    def handle(self, *args, **options):
+        if Progress._meta.db_table not in connection.introspection.table_names():
+            self.stdout.write(self.style.SUCCESS('Brak tabeli postępów - nie ma czego scalać'))
+            return
+
+        removed, user_ids = dedupe_progress()
+        if not removed:
+            self.stdout.write(self.style.SUCCESS('Brak zdublowanych postępów'))
+            return
+
+        # Podsumowania liczą kolumny dodawane migracją - przeliczamy je dopiero po niej
+        self.stdout.write(self.style.SUCCESS(
+            f'Usunięto {removed} zdublowanych wierszy postępów ({len(user_ids)} użytkowników). '
+            f'Po migracji uruchom rebuild_user_progress i backfill_daily_activity --reset.'
+        ))
@@ -0,0 +1,164 @@
+# backend/api/management/commands/loadtest_completions.py
+# Uruchomienie: python manage.py loadtest_completions --users 20 --lessons 25 --threads 16 --retries 0.3
+
+import queue
+import random
+import statistics
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from accounts.authentication import tokens_for_user
+from accounts.models import CustomUser
+from api.models import ActivityLog, Course, IdempotencyKey, Lesson, Progress
+
+LESSON_POINTS = 10
+
+
+class Command(BaseCommand):
+    help = 'Równoległe ukończenia lekcji z ponowieniami: przepustowość i spójność punktów'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Liczba uczniów')
+        parser.add_argument('--lessons', type=int, default=25, help='Liczba lekcji')
+        parser.add_argument('--threads', type=int, default=16, help='Liczba równoległych klientów')
+        parser.add_argument('--retries', type=float, default=0.3, help='Odsetek żądań ponawianych z tym samym kluczem')
+
+    def handle(self, *args, **options):
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        self.host = host
+        suffix = random.randint(0, 10 ** 9)
+        users = [
+            CustomUser.objects.create_user(username=f'load_{suffix}_{i}', password='load', role='student')
+            for i in range(options['users'])
+        ]
+        course = Course.objects.create(title=f'Load test {suffix}')
+        lessons = Lesson.objects.bulk_create(
+            Lesson(course=course, title=f'Lekcja {i}', points=LESSON_POINTS) for i in range(options['lessons'])
+        )
+        try:
+            self.count_queries(users[0], lessons[0])
+            self.run(users, lessons, options)
+        finally:
+            CustomUser.objects.filter(id__in=[user.id for user in users]).delete()
+            course.delete()
+
+    def client(self, user):
+        return Client(HTTP_HOST=self.host, HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+
+    def complete(self, client, lesson, key, score):
+        return client.post(
+            f'/api/lessons/{lesson.id}/complete/', {'score': score},
+            content_type='application/json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def count_queries(self, user, lesson):
+        """Liczba zapytań SQL na pierwsze ukończenie i na ponowienie (rozgrzany cache uwierzytelnienia)"""
+        client = self.client(user)
+        key = str(uuid.uuid4())
+        client.get('/api/courses/')
+        with CaptureQueriesContext(connection) as first:
+            self.complete(client, lesson, key, 90)
+        with CaptureQueriesContext(connection) as replay:
+            response = self.complete(client, lesson, key, 90)
+        if response.get('Idempotent-Replayed') != 'true':
+            raise CommandError('Ponowienie nie zostało rozpoznane')
+        self.stdout.write(
+            f'Zapytania SQL: pierwsze ukończenie {len(first.captured_queries)}, '
+            f'ponowienie {len(replay.captured_queries)}'
+        )
+        # Ta lekcja jest już ukończona - sprzątamy, żeby nie zaburzyć weryfikacji
+        Progress.objects.filter(user=user).delete()
+        ActivityLog.objects.filter(user=user).delete()
+        IdempotencyKey.objects.filter(user=user).delete()
+        CustomUser.objects.filter(pk=user.pk).update(points=0, level=1)
+
+    def run(self, users, lessons, options):
+        # Każdy uczeń kończy każdą lekcję; część żądań jest wysyłana ponownie z tym samym kluczem
+        requests = []
+        for user in users:
+            for lesson in lessons:
+                job = (user, lesson, str(uuid.uuid4()), random.randint(50, 100))
+                requests.append(job)
+                if random.random() < options['retries']:
+                    requests.append(job)
+        random.shuffle(requests)
+        jobs = queue.Queue()
+        for job in requests:
+            jobs.put(job)
+
+        clients = {}
+        results = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def worker():
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        user, lesson, key, score = jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    with lock:
+                        client = clients.get(user.id) or clients.setdefault(user.id, self.client(user))
+                    t0 = time.perf_counter()
+                    response = self.complete(client, lesson, key, score)
+                    latency = time.perf_counter() - t0
+                    with lock:
+                        results.append((key, response.status_code, response.json(), latency))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        if errors:
+            raise CommandError(f'Błąd klienta: {errors[0]}')
+        failed = [status for _, status, _, _ in results if status not in (200, 201)]
+        if failed:
+            raise CommandError(f'{len(failed)} żądań zakończonych błędem (np. HTTP {failed[0]})')
+
+        latencies = sorted(latency for _, _, _, latency in results)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f'{len(results)} żądań ({len(results) - len(users) * len(lessons)} ponowień) '
+            f'z {options["threads"]} wątków w {elapsed:.2f}s: {len(results) / elapsed:.0f} ukończeń/s, '
+            f'mediana {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms'
+        )
+        self.verify(users, lessons, results)
+
+    def verify(self, users, lessons, results):
+        responses = {}
+        for key, _, data, _ in results:
+            if responses.setdefault(key, data) != data:
+                raise CommandError(f'Ponowienie klucza {key} zwróciło inną odpowiedź')
+
+        expected_points = len(lessons) * LESSON_POINTS
+        user_ids = [user.id for user in users]
+        wrong = CustomUser.objects.filter(id__in=user_ids).exclude(points=expected_points).count()
+        progress = Progress.objects.filter(user_id__in=user_ids, completed=True).count()
+        logged = ActivityLog.objects.filter(user_id__in=user_ids, action='lesson_complete').count()
+        expected = len(users) * len(lessons)
+
+        if wrong or progress != expected or logged != expected:
+            raise CommandError(
+                f'Niespójne dane: {wrong} uczniów z błędną sumą punktów, '
+                f'{progress}/{expected} postępów, {logged}/{expected} wpisów aktywności'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Spójne: każdy uczeń ma {expected_points} pkt, {expected} postępów i wpisów aktywności, '
+            f'ponowienia nie przyznały punktów drugi raz'
+        ))
@@ -0,0 +1,70 @@
+# backend/api/management/commands/partition_activity_logs.py
+# Uruchomienie: python manage.py partition_activity_logs --convert
+#               python manage.py partition_activity_logs --ahead 3
+#               python manage.py partition_activity_logs --drop-older-than 90
+# Każde uruchomienie zakłada też brakujące indeksy z ActivityLog.Meta.indexes
+# (także na tabelach zamienionych na partycjonowane przed ich dodaniem do modelu).
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from api import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Zarządza miesięcznymi partycjami tabeli logów aktywności (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Jednorazowo zamienia tabelę na partycjonowaną i kopiuje dane'
+        )
+        parser.add_argument(
+            '--keep-legacy',
+            action='store_true',
+            help='Przy --convert zachowuje starą tabelę jako <tabela>_legacy'
+        )
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=3,
+            help='Liczba przyszłych miesięcy, dla których tworzone są partycje'
+        )
+        parser.add_argument(
+            '--drop-older-than',
+            type=int,
+            metavar='DAYS',
+            help='Usuwa logi starsze niż podana liczba dni (całe partycje, potem resztę DELETE)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partycjonowanie wymaga PostgreSQL')
+
+        if options['convert']:
+            copied = partitioning.convert_to_partitioned(
+                months_ahead=options['ahead'],
+                keep_legacy=options['keep_legacy']
+            )
+            self.stdout.write(f'Tabela partycjonowana, skopiowano {copied} wierszy')
+
+        if not partitioning.is_partitioned():
+            raise CommandError('Tabela logów nie jest partycjonowana - uruchom z --convert')
+
+        created = partitioning.ensure_partitions(options['ahead'])
+        self.stdout.write(f'Partycje: {", ".join(created)}')
+
+        # Tabele zamienione wcześniejszym --convert mogą nie mieć indeksów z Meta
+        indexes = partitioning.sync_indexes()
+        self.stdout.write(f'Nowe indeksy: {", ".join(indexes) or "brak"}')
+
+        if options['drop_older_than']:
+            from analytics.retention import purge_activity_logs
+
+            result = purge_activity_logs(days=options['drop_older_than'])
+            self.stdout.write(
+                f'Usunięto partycje: {", ".join(result["partitions_dropped"]) or "brak"}, '
+                f'wierszy spoza nich: {result["deleted"]}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Gotowe'))
@@ -0,0 +1,56 @@
+# Wspólne mixiny serializerów i widoków
+FIELDS_QUERY_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Zwraca zbiór pól z ?fields=a,b,c albo None, gdy parametr nie został podany"""
+    if request is None or request.method != 'GET':
+        return None
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """Serializer zwracający tylko pola wskazane w ?fields= (nieznane nazwy są pomijane).
+
+    Ograniczenie działa dla serializera tworzonego z kontekstem żądania;
+    serializery zagnieżdżone jako pola zwracają komplet pól.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is None:
+            return
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+
+
+class SparseQuerysetMixin:
+    """Widok czytający z bazy tylko kolumny pól wybranych przez ?fields="""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = requested_fields(self.request)
+        if fields is None or self.action != 'list':
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        serializer_fields = serializer_class().fields
+        # Pola wyliczane mogą wskazać swoje kolumny w Meta.sparse_columns
+        extra = getattr(serializer_class.Meta, 'sparse_columns', {})
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = set()
+        for name in fields & set(serializer_fields):
+            source = serializer_fields[name].source
+            if source in model_fields:
+                columns.add(source)
+            columns.update(extra.get(name, ()))
+        # Kolumny używane przez stronicowanie muszą zostać wczytane
+        ordering = getattr(self.paginator, 'ordering', ())
+        columns.update(field.lstrip('-') for field in ordering)
+        columns.add(queryset.model._meta.pk.name)
+        return queryset.only(*columns)
+
@@ -1,6 +1,8 @@
 from django.db import models
 import uuid
 from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
 
 
 class Course(models.Model):
@@ -33,6 +35,16 @@ class Progress(models.Model):
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     score = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Jeden wiersz na parę (user, lesson) - klucz upsertu i stronicowania listy
+        unique_together = ('user', 'lesson')
+        indexes = [
+            models.Index(fields=['user', 'completed', 'completed_at']),
+            # Zmiany od ostatniej synchronizacji urządzenia
+            models.Index(fields=['user', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.lesson} ({'done' if self.completed else 'todo'})"
@@ -52,7 +64,42 @@ class ActivityLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='activity_logs', on_delete=models.CASCADE)
     action = models.CharField(max_length=255)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),
+            # Ostatnia aktywność ucznia (dashboard klasy) i strumień aktywności
+            # stronicowany po kluczu (created_at, id) - odczyt prosto z indeksu
+            models.Index(fields=['user', '-created_at', '-id']),
+            # Strumień z ?action=: logowania to większość tabeli, więc indeks
+            # częściowy obejmuje tylko pozostałe akcje (?action=login idzie indeksem wyżej)
+            models.Index(
+                fields=['user', 'action', '-created_at', '-id'],
+                condition=~Q(action='login'),
+                name='activity_user_action_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.action}"
+
+
+class IdempotencyKey(models.Model):
+    """Zapamiętana odpowiedź na żądanie z nagłówkiem Idempotency-Key (ponowienia klienta)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=255)
+    status_code = models.IntegerField(null=True)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        unique_together = ('user', 'key')
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
@@ -0,0 +1,121 @@
+# Stronicowanie po kluczu (keyset) zamiast OFFSET
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Stronicowanie po indeksowanym kluczu (domyślnie created_at, id).
+
+    Kursor to ostatni klucz poprzedniej strony, a kolejna strona zaczyna
+    się warunkiem (created_at, id) > kursor - bez OFFSET i bez COUNT(*),
+    więc dalekie strony kosztują tyle samo co pierwsza. Kolumny klucza
+    muszą być wspólnie unikalne (stąd id jako drugie pole) i pokryte indeksem.
+    """
+    page_size = 20
+    max_page_size = 200
+    ordering = ('created_at', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        fields = [field.lstrip('-') for field in self.ordering]
+        descending = self.ordering[0].startswith('-')
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            cursor = self.cursor_values(queryset.model, fields, cursor)
+            queryset = queryset.filter(self.after(fields, cursor, descending))
+
+        # Jeden wiersz więcej mówi, czy istnieje następna strona
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.next_key = [self.key_value(page[-1], field) for field in fields] if page else None
+        return page
+
+    def after(self, fields, values, descending):
+        """Warunek "klucz za kursorem" dla złożonego klucza: (a > x) OR (a = x AND b > y) ..."""
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for i, field in enumerate(fields):
+            step = Q(**{f'{field}__{lookup}': values[i]})
+            for previous, value in zip(fields[:i], values[:i]):
+                step &= Q(**{previous: value})
+            condition |= step
+        # Nadmiarowy warunek na pierwszym polu pozwala bazie zacząć skan indeksu od kursora
+        return Q(**{f'{fields[0]}__{lookup}e': values[0]}) & condition
+
+    def key_value(self, obj, field):
+        value = obj[field] if isinstance(obj, dict) else getattr(obj, field)
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound('Nieprawidłowy kursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound('Nieprawidłowy kursor')
+        return values
+
+    def cursor_values(self, model, fields, values):
+        """Wartości kursora przekształcone typami pól klucza; złe wartości dają 404, nie 500"""
+        parsed = []
+        for field, value in zip(fields, values):
+            if value is None:
+                raise NotFound('Nieprawidłowy kursor')
+            try:
+                parsed.append(model._meta.get_field(field).to_python(value))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound('Nieprawidłowy kursor')
+        return parsed
+
+    def encode_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_key))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ProgressPagination(KeysetPagination):
+    """Postępy stronicowane po unikalnym indeksie (user, lesson)"""
+    ordering = ('user_id', 'lesson_id')
+
+
+class ActivityPagination(KeysetPagination):
+    """Strumień aktywności od najnowszych, po indeksie (user, -created_at, -id)"""
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,202 @@
+# Partycjonowanie tabeli logów aktywności (PostgreSQL, zakresy miesięczne)
+import logging
+from datetime import date, datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+TABLE = ActivityLog._meta.db_table
+LEGACY_TABLE = f'{TABLE}_legacy'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def _month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value):
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _utc_today():
+    # Granice partycji są liczone w UTC, więc "dziś" również
+    return timezone.now().astimezone(dt_timezone.utc).date()
+
+
+def _bounds(month):
+    lower = datetime.combine(month, datetime.min.time(), tzinfo=dt_timezone.utc)
+    upper = datetime.combine(_next_month(month), datetime.min.time(), tzinfo=dt_timezone.utc)
+    return lower, upper
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def is_partitioned():
+    """Sprawdza, czy tabela logów jest już tabelą partycjonowaną"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '
+            'WHERE c.relname = %s AND pg_table_is_visible(c.oid)',
+            [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def create_partition(cursor, month):
+    """Tworzy partycję dla miesiąca zaczynającego się w `month` (jeśli nie istnieje).
+
+    Wiersze tego miesiąca, które trafiły już do partycji domyślnej, są
+    przenoszone do nowej partycji - inaczej PostgreSQL odmawia jej utworzenia.
+    Wywoływać w transakcji. Zwraca True, gdy partycja powstała.
+    """
+    name = partition_name(month)
+    lower, upper = _bounds(month)
+    cursor.execute('SELECT to_regclass(%s)', [name])
+    if cursor.fetchone()[0] is not None:
+        return False
+
+    cursor.execute(
+        f'SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s LIMIT 1',
+        [lower, upper]
+    )
+    if cursor.fetchone() is None:
+        cursor.execute(
+            f'CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)',
+            [lower, upper]
+        )
+        return True
+
+    cursor.execute(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved',
+        [lower, upper]
+    )
+    logger.info(f"Przeniesiono {cursor.rowcount} logów z partycji domyślnej do {name}")
+    # Indeksy i klucze tabeli nadrzędnej są zakładane na partycji przy dołączeniu
+    cursor.execute(
+        f'ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)',
+        [lower, upper]
+    )
+    return True
+
+
+def sync_indexes():
+    """Zakłada brakujące indeksy z ActivityLog.Meta.indexes.
+
+    Na tabeli partycjonowanej indeks trafia do wszystkich partycji (także
+    przyszłych), więc model i tabela mają te same indeksy. Zwraca nazwy
+    utworzonych indeksów.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT indexname FROM pg_indexes WHERE tablename = %s', [TABLE])
+        existing = {name for name, in cursor.fetchall()}
+
+    created = []
+    with connection.schema_editor() as editor:
+        for index in ActivityLog._meta.indexes:
+            if index.name not in existing:
+                editor.add_index(ActivityLog, index)
+                created.append(index.name)
+    return created
+
+
+def convert_to_partitioned(months_ahead=3, keep_legacy=False):
+    """Zamienia zwykłą tabelę logów na partycjonowaną miesięcznie i kopiuje dane.
+
+    Klucz główny staje się (id, created_at), bo PostgreSQL wymaga, aby
+    zawierał kolumnę partycjonującą. Indeksy z ActivityLog.Meta są zakładane
+    po skopiowaniu danych. Operacja wykonuje się w jednej transakcji.
+    """
+    if is_partitioned():
+        return 0
+
+    user_table = ActivityLog._meta.get_field('user').related_model._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}')
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_part_pkey PRIMARY KEY (id, created_at)')
+        cursor.execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT')
+
+        cursor.execute(f'SELECT min(created_at) FROM {LEGACY_TABLE}')
+        oldest = cursor.fetchone()[0]
+        today = _utc_today()
+        month = _month_start(oldest.astimezone(dt_timezone.utc)) if oldest else _month_start(today)
+        last = _month_start(today)
+        for _ in range(months_ahead):
+            last = _next_month(last)
+        while month <= last:
+            create_partition(cursor, month)
+            month = _next_month(month)
+
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {LEGACY_TABLE}')
+        copied = cursor.rowcount
+        if keep_legacy:
+            # Nazwy indeksów są wspólne dla schematu - stara tabela oddaje swoje
+            for index in ActivityLog._meta.indexes:
+                cursor.execute(f'ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_old')
+        else:
+            cursor.execute(f'DROP TABLE {LEGACY_TABLE}')
+
+        cursor.execute(f'CREATE INDEX ON {TABLE} (user_id)')
+        sync_indexes()
+        # Klucz obcy na końcu: jedna walidacja całej tabeli zamiast wyzwalaczy przy kopiowaniu
+        cursor.execute(
+            f'ALTER TABLE {TABLE} ADD FOREIGN KEY (user_id) REFERENCES {user_table} (id) '
+            f'DEFERRABLE INITIALLY DEFERRED'
+        )
+
+    logger.info(f"Przeniesiono {copied} logów aktywności do tabeli partycjonowanej")
+    return copied
+
+
+def ensure_partitions(months_ahead=3):
+    """Tworzy z wyprzedzeniem partycje na bieżący i kolejne miesiące"""
+    month = _month_start(_utc_today())
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for _ in range(months_ahead + 1):
+            create_partition(cursor, month)
+            created.append(partition_name(month))
+            month = _next_month(month)
+    return created
+
+
+def list_partitions():
+    """Zwraca nazwy miesięcznych partycji posortowane od najstarszej"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = %s ORDER BY c.relname',
+            [TABLE]
+        )
+        return [name for (name,) in cursor.fetchall() if name != DEFAULT_PARTITION]
+
+
+def drop_partitions_before(cutoff):
+    """Odłącza i usuwa partycje, których cały zakres jest starszy niż `cutoff`.
+
+    Wiersze z miesiąca, który wygasł tylko częściowo, oraz z partycji
+    domyślnej zostają - usuwa je purge_activity_logs zwykłym DELETE.
+    """
+    dropped = []
+    for name in list_partitions():
+        month = datetime.strptime(name.rsplit('_p', 1)[1], '%Y%m').date()
+        if _bounds(month)[1] > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+            cursor.execute(f'DROP TABLE {name}')
+        dropped.append(name)
+        logger.info(f"Usunięto partycję {name}")
+    return dropped
@@ -0,0 +1,287 @@
+# Zapis postępów jako upsert po kluczu (user, lesson)
+import base64
+import json
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from accounts.models import CustomUser
+from .models import Lesson, Progress
+from .signals import progress_changed, progress_delta, progress_deltas, send_progress_changed
+
+_TABLE = Progress._meta.db_table
+
+# DO NOTHING czeka na równoległy INSERT tego samego klucza i nie zwraca wiersza,
+# więc o tym, czy rekord powstał, decyduje baza, a nie wcześniejszy SELECT
+_INSERT_SQL = f'''
+    INSERT INTO {_TABLE} (id, user_id, lesson_id, completed, completed_at, score, updated_at)
+    VALUES {{values}}
+    ON CONFLICT (user_id, lesson_id) DO NOTHING
+    RETURNING lesson_id
+'''
+_ROW = '(%s, %s, %s, %s, %s, %s, %s)'
+
+
+def _prep(field_name, value):
+    return Progress._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+
+def _insert_many(rows):
+    """Wielowierszowy INSERT ... ON CONFLICT DO NOTHING; zwraca id lekcji, dla których wiersz powstał"""
+    if not rows:
+        return set()
+    params = []
+    for progress in rows:
+        params.extend([
+            _prep('id', progress.id),
+            _prep('user', progress.user_id),
+            _prep('lesson', progress.lesson_id),
+            progress.completed,
+            _prep('completed_at', progress.completed_at),
+            progress.score,
+            _prep('updated_at', progress.updated_at),
+        ])
+    with connection.cursor() as cursor:
+        cursor.execute(_INSERT_SQL.format(values=', '.join([_ROW] * len(rows))), params)
+        lesson_field = Progress._meta.get_field('lesson')
+        return {lesson_field.to_python(lesson_id) for lesson_id, in cursor.fetchall()}
+
+
+def _insert(progress):
+    """INSERT ... ON CONFLICT DO NOTHING; zwraca True, gdy wiersz powstał"""
+    return bool(_insert_many([progress]))
+
+
+def award_progress_points(user_id, deltas):
+    """Przenosi punkty lekcji z różnic postępu na konto użytkownika (award_points).
+
+    Zapisy z pominięciem complete_lesson (upsert, synchronizacja, panel admina)
+    też zmieniają CustomUser.points i rankingi, więc zgadzają się one z
+    DailyActivity.points_earned; cofnięcie ukończenia odejmuje punkty lekcji.
+    """
+    points = sum(delta['points_delta'] for delta in deltas)
+    if points:
+        CustomUser.objects.award_points([user_id], points)
+
+
+def record_progress(user_id, lesson, completed=None, score=None, completed_at=None):
+    """Zapisuje postęp użytkownika w lekcji (INSERT albo UPDATE istniejącego wiersza).
+
+    Pola równe None nie są zmieniane. Przy ukończeniu bez podanej daty
+    completed_at ustawiane jest na bieżącą chwilę. Zmiana wysyła
+    progress_changed z różnicą względem poprzedniego stanu i przyznaje
+    (lub odbiera) punkty lekcji - w tej samej transakcji, pod blokadą
+    wiersza. Zwraca (progress, created).
+    """
+    now = timezone.now()
+    # Bez savepointu: błąd i tak wycofuje całą transakcję wywołującego
+    with transaction.atomic(savepoint=False):
+        progress = Progress(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            lesson=lesson,
+            completed=bool(completed),
+            completed_at=completed_at or (now if completed else None),
+            score=score or 0.0,
+            updated_at=now,
+        )
+        if _insert(progress):
+            award_progress_points(user_id, send_progress_changed(progress))
+            return progress, True
+
+        progress = Progress.objects.select_for_update().get(user_id=user_id, lesson=lesson)
+        progress.lesson = lesson
+        previous = (progress.completed, progress.score, progress.completed_at)
+        updates = {'completed': completed, 'score': score}
+        if completed_at is not None:
+            updates['completed_at'] = completed_at
+        elif completed and (not progress.completed or progress.completed_at is None):
+            updates['completed_at'] = now
+        updates = {field: value for field, value in updates.items() if value is not None}
+
+        for field, value in updates.items():
+            setattr(progress, field, value)
+        if (progress.completed, progress.score, progress.completed_at) != previous:
+            progress.updated_at = now
+            Progress.objects.filter(pk=progress.pk).update(updated_at=now, **updates)
+            award_progress_points(user_id, send_progress_changed(progress, previous))
+        return progress, False
+
+
+def complete_progress(user_id, lesson, score=0.0):
+    """Oznacza lekcję jako ukończoną, zachowując najlepszy wynik i datę pierwszego ukończenia.
+
+    Zwraca (progress, first_completion) - punkty za lekcję należą się
+    tylko przy pierwszym ukończeniu.
+    """
+    now = timezone.now()
+    # Bez savepointu: błąd i tak wycofuje całą transakcję wywołującego
+    with transaction.atomic(savepoint=False):
+        progress = Progress(
+            id=uuid.uuid4(), user_id=user_id, lesson=lesson,
+            completed=True, completed_at=now, score=score, updated_at=now,
+        )
+        if _insert(progress):
+            send_progress_changed(progress)
+            return progress, True
+
+        progress = Progress.objects.select_for_update().get(user_id=user_id, lesson=lesson)
+        progress.lesson = lesson
+        previous = (progress.completed, progress.score, progress.completed_at)
+        first_completion = not progress.completed
+        progress.completed = True
+        progress.score = max(progress.score, score)
+        if first_completion:
+            progress.completed_at = now
+
+        if (progress.completed, progress.score, progress.completed_at) != previous:
+            progress.updated_at = now
+            Progress.objects.filter(pk=progress.pk).update(
+                completed=True, score=progress.score, completed_at=progress.completed_at, updated_at=now
+            )
+            send_progress_changed(progress, previous)
+        return progress, first_completion
+
+
+def dedupe_progress():
+    """Scala zdublowane wiersze (user, lesson) sprzed ograniczenia unikalności.
+
+    Zasada jak w merge_events: ukończenie jest trwałe, wygrywa najlepszy wynik
+    i najwcześniejsza data ukończenia. Zostaje jeden wiersz na parę, resztę
+    usuwa. Uruchamiana przed migracją, więc czyta i zapisuje tylko kolumny
+    istniejące wcześniej (bez updated_at). Podsumowania trzeba przeliczyć
+    po migracji. Zwraca (liczba usuniętych wierszy, id użytkowników ze
+    scalonymi wierszami).
+    """
+    from django.db.models import Count
+
+    columns = ('id', 'user_id', 'lesson_id', 'completed', 'completed_at', 'score')
+    pairs = Progress.objects.values('user_id', 'lesson_id').annotate(
+        rows=Count('id')
+    ).filter(rows__gt=1).order_by()
+    removed = 0
+    user_ids = set()
+    with transaction.atomic():
+        for pair in pairs.iterator():
+            rows = list(Progress.objects.select_for_update().filter(
+                user_id=pair['user_id'], lesson_id=pair['lesson_id']
+            ).only(*columns).order_by('id'))
+            keep = rows[0]
+            completed = [row.completed_at for row in rows if row.completed and row.completed_at]
+            Progress.objects.filter(pk=keep.pk).update(
+                completed=any(row.completed for row in rows),
+                score=max(row.score for row in rows),
+                completed_at=min(completed) if completed else None,
+            )
+            removed += Progress.objects.filter(
+                pk__in=[row.pk for row in rows[1:]]
+            ).only('id', 'user_id').delete()[0]
+            user_ids.add(pair['user_id'])
+    return removed, user_ids
+
+
+def encode_sync_token(moment):
+    return base64.urlsafe_b64encode(json.dumps({'since': moment.isoformat()}).encode()).decode()
+
+
+def decode_sync_token(token):
+    """Zwraca chwilę zapisaną w tokenie synchronizacji albo None dla nieprawidłowego tokenu"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        return parse_datetime(data['since'])
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+        return None
+
+
+def merge_events(events, now, earliest=None):
+    """Składa zdarzenia klienta w stan docelowy per lekcja.
+
+    Ukończenie jest trwałe, wygrywa najlepszy wynik i najwcześniejsza data
+    ukończenia. Znaczniki czasu spoza [earliest, now] są przycinane do granic.
+    Zwraca (stan per lekcja, indeksy przyciętych zdarzeń).
+    """
+    merged = {}
+    clamped = []
+    for index, event in enumerate(events):
+        state = merged.setdefault(event['lesson'], {'completed': False, 'score': 0.0, 'completed_at': None})
+        state['score'] = max(state['score'], event.get('score') or 0.0)
+        if event.get('completed'):
+            state['completed'] = True
+            moment = event.get('client_timestamp') or now
+            if moment > now or (earliest is not None and moment < earliest):
+                moment = now if moment > now else earliest
+                clamped.append(index)
+            if state['completed_at'] is None or moment < state['completed_at']:
+                state['completed_at'] = moment
+    return merged, clamped
+
+
+def _send_grouped_changes(user_id, deltas):
+    """Jeden progress_changed na dzień ukończenia zamiast jednego na lekcję"""
+    by_day = {}
+    for delta in deltas:
+        day = timezone.localdate(delta['completed_at']) if delta['completed_at'] else None
+        group = by_day.setdefault(day, dict(delta, completed_delta=0, points_delta=0, score_delta=0.0))
+        for field in ('completed_delta', 'points_delta', 'score_delta'):
+            group[field] += delta[field]
+    for group in by_day.values():
+        if group['completed_delta'] or group['score_delta']:
+            progress_changed.send(sender=Progress, **group)
+
+
+def sync_progress(user_id, events, since=None, earliest=None):
+    """Stosuje paczkę zdarzeń postępu z urządzenia i zwraca zmiany od ostatniej synchronizacji.
+
+    Zdarzenia są łączone w pamięci (merge_events), a potem zapisywane w jednej
+    transakcji: nowe wiersze jednym INSERT ... ON CONFLICT DO NOTHING,
+    istniejące - odczytane pod blokadą i zaktualizowane jednym bulk_update.
+    Daty ukończeń nie mogą być wcześniejsze niż `earliest` (założenie konta).
+    Zwraca (zastosowane, odrzucone_lekcje, przycięte_zdarzenia, zmiany, token):
+    zmiany to wiersze użytkownika zmienione po `since` (z zakładką
+    SYNC_TOKEN_OVERLAP na transakcje zatwierdzone później) - klient scala je po id.
+    """
+    now = timezone.now()
+    merged, clamped = merge_events(events, now, earliest)
+    lessons = Lesson.objects.in_bulk(list(merged))
+    rejected = sorted(str(lesson_id) for lesson_id in merged if lesson_id not in lessons)
+    merged = {lesson_id: state for lesson_id, state in merged.items() if lesson_id in lessons}
+
+    with transaction.atomic():
+        rows = [
+            Progress(id=uuid.uuid4(), user_id=user_id, lesson=lessons[lesson_id], updated_at=now, **state)
+            for lesson_id, state in sorted(merged.items())
+        ]
+        inserted = _insert_many(rows)
+        changes = [progress_delta(progress) for progress in rows if progress.lesson_id in inserted]
+
+        existing = Progress.objects.select_for_update().filter(
+            user_id=user_id, lesson_id__in=[lesson_id for lesson_id in merged if lesson_id not in inserted]
+        ).order_by('lesson_id')
+        updated = []
+        for progress in existing:
+            progress.lesson = lessons[progress.lesson_id]
+            state = merged[progress.lesson_id]
+            previous = (progress.completed, progress.score, progress.completed_at)
+            progress.completed = progress.completed or state['completed']
+            progress.score = max(progress.score, state['score'])
+            if state['completed_at'] and (progress.completed_at is None or state['completed_at'] < progress.completed_at):
+                progress.completed_at = state['completed_at']
+            if (progress.completed, progress.score, progress.completed_at) == previous:
+                continue
+            progress.updated_at = now
+            updated.append(progress)
+            # Wcześniejsza data ukończenia przenosi ukończenie między dniami
+            changes.extend(progress_deltas(progress, previous))
+        if updated:
+            Progress.objects.bulk_update(updated, ['completed', 'score', 'completed_at', 'updated_at'])
+
+        _send_grouped_changes(user_id, changes)
+        award_progress_points(user_id, changes)
+
+    delta = Progress.objects.filter(user_id=user_id)
+    if since is not None:
+        delta = delta.filter(updated_at__gte=since - timedelta(seconds=settings.SYNC_TOKEN_OVERLAP))
+    return len(merged), rejected, clamped, delta.order_by('updated_at', 'id'), encode_sync_token(now)
@@ -0,0 +1,27 @@
+# Renderer JSON oparty na orjson
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Zamiennik JSONRenderer: orjson koduje słowniki, listy i UUID w C.
+
+    Typy, których orjson nie zna (Decimal, leniwe tłumaczenia, QuerySet,
+    timedelta...), oraz daty przechodzą przez koder DRF, więc wynik jest
+    taki sam jak z JSONRenderer.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            default=_encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
@@ -1,26 +1,69 @@
 from rest_framework import serializers
-from .models import Course, Lesson, Progress, UserAchievement
+from .mixins import SparseFieldsetMixin
+from .models import ActivityLog, Course, Lesson, Progress, UserAchievement
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Course
         fields = ['id', 'title', 'description', 'is_active', 'difficulty']
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = ['id', 'course', 'title', 'points', 'duration_minutes', 'is_active']
 
 
-class ProgressSerializer(serializers.ModelSerializer):
+class LessonTreeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Lesson
+        fields = ['id', 'title', 'points', 'duration_minutes']
+
+
+class CourseTreeSerializer(serializers.ModelSerializer):
+    """Kurs z aktywnymi lekcjami; liczniki pochodzą z adnotacji zapytania, nie z COUNT per wiersz"""
+    lesson_count = serializers.IntegerField(read_only=True)
+    total_points = serializers.IntegerField(read_only=True)
+    total_minutes = serializers.IntegerField(read_only=True)
+    lessons = LessonTreeSerializer(source='active_lessons', many=True, read_only=True)
+
+    class Meta:
+        model = Course
+        fields = [
+            'id', 'title', 'description', 'difficulty',
+            'lesson_count', 'total_points', 'total_minutes', 'lessons'
+        ]
+
+
+class ProgressSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Progress
-        fields = ['id', 'user', 'lesson', 'completed', 'completed_at', 'score']
+        fields = ['id', 'user', 'lesson', 'completed', 'completed_at', 'score', 'updated_at']
+        read_only_fields = ['id', 'user', 'updated_at']
+        # Bez domyślnego walidatora unique_together: drugi zapis tej samej lekcji to aktualizacja
+        validators = []
+
+
+class LessonCompletionSerializer(serializers.Serializer):
+    score = serializers.FloatField(min_value=0, max_value=100, default=0)
+
 
+class ProgressEventSerializer(serializers.Serializer):
+    """Zdarzenie postępu zapisane na urządzeniu (offline) do synchronizacji"""
+    lesson = serializers.UUIDField()
+    completed = serializers.BooleanField(default=False)
+    score = serializers.FloatField(min_value=0, max_value=100, default=0)
+    client_timestamp = serializers.DateTimeField(required=False)
 
-class UserAchievementSerializer(serializers.ModelSerializer):
+
+class UserAchievementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = UserAchievement
         fields = ['id', 'user', 'name', 'awarded_at']
+
+
+class ActivityLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ActivityLog
+        fields = ['id', 'user', 'action', 'created_at']
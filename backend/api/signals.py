@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+from .models import Course, Lesson
+
+# Wysyłany po zapisie postępu; argumenty: user_id, completed_at,
+# completed_delta, points_delta, score_delta (zmiany względem poprzedniego stanu)
+progress_changed = Signal()
+
+
+def progress_delta(progress, previous=None):
+    """Argumenty progress_changed dla zmiany z `previous` do bieżącego stanu postępu.
+
+    previous to krotka (completed, score, completed_at) sprzed zapisu albo None
+    dla nowego rekordu; dla usuniętego rekordu progress.completed powinno być False.
+    """
+    was_completed, old_score, old_completed_at = previous or (False, 0, None)
+
+    completed_delta = int(progress.completed) - int(was_completed)
+    return {
+        'user_id': progress.user_id,
+        # Ukończenie bez daty (stare wiersze) liczy się w dniu zapisu
+        'completed_at': progress.completed_at or old_completed_at or timezone.now(),
+        'completed_delta': completed_delta,
+        'points_delta': completed_delta * progress.lesson.points,
+        'score_delta': (progress.score if progress.completed else 0) - (old_score if was_completed else 0),
+    }
+
+
+def progress_deltas(progress, previous=None):
+    """Jak progress_delta, ale zmiana daty ukończenia daje dwie różnice:
+    wycofanie ukończenia ze starego dnia i ukończenie w nowym"""
+    if previous and previous[0] and progress.completed and previous[2] and progress.completed_at != previous[2]:
+        return [
+            dict(
+                progress_delta(progress, previous),
+                completed_at=previous[2], completed_delta=-1,
+                points_delta=-progress.lesson.points, score_delta=-previous[1],
+            ),
+            progress_delta(progress),
+        ]
+    return [progress_delta(progress, previous)]
+
+
+def send_progress_changed(progress, previous=None):
+    """Wysyła progress_changed na podstawie poprzedniego i bieżącego stanu postępu; zwraca różnice"""
+    deltas = progress_deltas(progress, previous)
+    for delta in deltas:
+        if delta['completed_delta'] or delta['score_delta']:
+            progress_changed.send(sender=progress.__class__, **delta)
+    return deltas
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def bump_catalog_on_change(sender, **kwargs):
+    """Zmiana kursu lub lekcji (np. w panelu admina) unieważnia cache katalogu"""
+    from .catalog import bump_catalog_version
+
+    transaction.on_commit(bump_catalog_version)
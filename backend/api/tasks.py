@@ -0,0 +1,39 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def create_activity_log_partitions(months_ahead=3):
+    """Tworzy z wyprzedzeniem miesięczne partycje logów aktywności"""
+    from .partitioning import ensure_partitions, is_partitioned
+
+    if not is_partitioned():
+        return []
+
+    created = ensure_partitions(months_ahead)
+    logger.info(f"Partycje logów aktywności gotowe: {', '.join(created)}")
+    return created
+
+
+@shared_task(ignore_result=True)
+def flush_activity_log_buffer():
+    """Zapisuje do bazy logi aktywności zbuforowane w Redis"""
+    from django.conf import settings
+    from .activity import RedisBuffer
+
+    written = RedisBuffer(settings.ACTIVITY_LOG_BATCH_SIZE).flush()
+    if written:
+        logger.info(f"Zapisano {written} logów aktywności z bufora")
+    return written
+
+
+@shared_task
+def purge_idempotency_keys():
+    """Usuwa przeterminowane klucze idempotencji"""
+    from .completion import purge_idempotency_keys as purge
+
+    deleted = purge()
+    logger.info(f"Usunięto {deleted} kluczy idempotencji")
+    return deleted
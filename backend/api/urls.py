@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CourseViewSet, LessonViewSet, ProgressViewSet
+from .views import ActivityLogViewSet, CourseViewSet, LessonViewSet, ProgressViewSet
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet, basename='course')
 router.register(r'lessons', LessonViewSet, basename='lesson')
 router.register(r'progress', ProgressViewSet, basename='progress')
+router.register(r'activity', ActivityLogViewSet, basename='activity')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,22 +1,195 @@
-from rest_framework import viewsets
+import uuid
+from django.db import transaction
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .models import Course, Lesson, Progress
-from .serializers import CourseSerializer, LessonSerializer, ProgressSerializer
+from rest_framework.response import Response
+from accounts.models import CustomUser
+from .catalog import CatalogCacheMixin
+from .fast import FastListMixin
+from .mixins import SparseQuerysetMixin
+from .models import ActivityLog, Course, Lesson, Progress
+from .pagination import ActivityPagination, ProgressPagination
+from .progress import award_progress_points, record_progress
+from .serializers import (
+    ActivityLogSerializer, CourseSerializer, LessonSerializer, LessonCompletionSerializer,
+    ProgressEventSerializer, ProgressSerializer
+)
+from .signals import send_progress_changed
 
 
-class CourseViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Course.objects.filter(is_active=True)
+MAX_SYNC_EVENTS = 1000
+
+
+class CourseViewSet(CatalogCacheMixin, FastListMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Course.objects.filter(is_active=True).order_by('title', 'id')
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """Cały katalog jednym żądaniem: aktywne kursy z lekcjami i licznikami"""
+        from .catalog import course_tree_response
+
+        return course_tree_response(request)
 
-class LessonViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Lesson.objects.all()
+
+class LessonViewSet(CatalogCacheMixin, FastListMixin, SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Lesson.objects.order_by('course_id', 'title', 'id')
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Ukończenie lekcji; ponowienia z tym samym nagłówkiem Idempotency-Key nie przyznają punktów drugi raz"""
+        from .completion import IdempotencyConflict, complete_lesson
+
+        lesson = self.get_object()
+        if not lesson.is_active:
+            return Response({'error': 'Lekcja jest nieaktywna'}, status=status.HTTP_400_BAD_REQUEST)
+        key = request.headers.get('Idempotency-Key')
+        if key is not None and not 0 < len(key) <= 255:
+            return Response({'error': 'Nieprawidłowy klucz idempotencji'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = LessonCompletionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            status_code, data, replayed = complete_lesson(
+                request.user.id, lesson, serializer.validated_data['score'], key
+            )
+        except IdempotencyConflict:
+            return Response(
+                {'error': 'Klucz idempotencji został już użyty dla innego żądania'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        response = Response(data, status=status_code)
+        if replayed:
+            response['Idempotent-Replayed'] = 'true'
+        return response
 
-class ProgressViewSet(viewsets.ModelViewSet):
-    queryset = Progress.objects.all()
+
+class ProgressViewSet(FastListMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = ProgressSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ProgressPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        progress = Progress.objects.all()
+        if user.role == 'admin':
+            pass
+        elif user.role == 'teacher' and self.request.method in ('GET', 'HEAD', 'OPTIONS'):
+            # Nauczyciel czyta postępy uczniów swoich klas, ale zapisuje tylko własne
+            progress = progress.filter(user__in=CustomUser.objects.students_of(user).values('id'))
+        else:
+            progress = progress.filter(user_id=user.id)
+
+        # ?completed= korzysta z indeksu (user, completed, completed_at)
+        completed = self.request.query_params.get('completed')
+        if completed in ('true', 'false'):
+            progress = progress.filter(completed=completed == 'true')
+        return progress
+
+    def create(self, request, *args, **kwargs):
+        """Upsert po (user, lesson): drugi zapis tej samej lekcji aktualizuje wiersz"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        progress, created = record_progress(
+            request.user.id,
+            data['lesson'],
+            completed=data.get('completed'),
+            score=data.get('score'),
+            completed_at=data.get('completed_at'),
+        )
+        return Response(
+            self.get_serializer(progress).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def perform_update(self, serializer):
+        # Lekcja jest częścią klucza - aktualizacja zmienia tylko stan postępu
+        instance = serializer.instance
+        data = serializer.validated_data
+        serializer.instance, _ = record_progress(
+            instance.user_id,
+            instance.lesson,
+            completed=data.get('completed'),
+            score=data.get('score'),
+            completed_at=data.get('completed_at'),
+        )
+
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        """Synchronizacja offline: {"sync_token": ..., "events": [...]} -> zmiany od ostatniej synchronizacji"""
+        from .progress import decode_sync_token, sync_progress
+
+        data = request.data if isinstance(request.data, dict) else {}
+        events = data.get('events', [])
+        if not isinstance(events, list):
+            return Response({'error': 'Oczekiwano listy zdarzeń w polu events'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > MAX_SYNC_EVENTS:
+            return Response(
+                {'error': f'Maksymalnie {MAX_SYNC_EVENTS} zdarzeń w jednym żądaniu'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        since = None
+        if data.get('sync_token'):
+            since = decode_sync_token(data['sync_token'])
+            if since is None:
+                return Response({'error': 'Nieprawidłowy token synchronizacji'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ProgressEventSerializer(data=events, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        applied, rejected, clamped, changes, token = sync_progress(
+            request.user.id, serializer.validated_data, since, earliest=request.user.date_joined
+        )
+        return Response({
+            'applied': applied,
+            'rejected_lessons': rejected,
+            # Indeksy zdarzeń, których client_timestamp przycięto do [założenie konta, teraz]
+            'clamped_events': clamped,
+            'changes': ProgressSerializer(changes, many=True).data,
+            'sync_token': token,
+        })
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        previous = (instance.completed, instance.score, instance.completed_at)
+        instance.delete()
+        instance.completed = False
+        award_progress_points(instance.user_id, send_progress_changed(instance, previous))
+
+
+class ActivityLogViewSet(FastListMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Strumień aktywności od najnowszych: własny, a dla nauczyciela i admina także ?user=<id>.
+
+    Stronicowanie po kluczu (created_at, id) i ?action= korzystają z indeksów
+    (user, -created_at, -id), więc koszt strony nie zależy od rozmiaru tabeli.
+    """
+    serializer_class = ActivityLogSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ActivityPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        target = self.request.query_params.get('user')
+        feed = ActivityLog.objects.all()
+        if target and user.role in ['admin', 'teacher']:
+            try:
+                target = uuid.UUID(target)
+            except ValueError:
+                raise ValidationError({'error': 'Nieprawidłowy identyfikator użytkownika'})
+            feed = feed.filter(user_id=target)
+            if user.role == 'teacher' and target != user.id:
+                # Nauczyciel widzi aktywność tylko uczniów swoich klas
+                feed = feed.filter(user_id__in=CustomUser.objects.students_of(user).values('id'))
+        else:
+            feed = feed.filter(user_id=user.id)
+
+        action_name = self.request.query_params.get('action')
+        if action_name:
+            feed = feed.filter(action=action_name)
+        return feed
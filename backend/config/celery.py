@@ -23,4 +23,20 @@ app.conf.beat_schedule = {
         'task': 'analytics.tasks.cleanup_old_activity_logs',
         'schedule': crontab(day_of_month='1', hour='3', minute='0'),  # Monthly
     },
+    'create-activity-log-partitions': {
+        'task': 'api.tasks.create_activity_log_partitions',
+        'schedule': crontab(day_of_month='20', hour='4', minute='0'),  # Monthly, ahead of rollover
+    },
+    'rebuild-leaderboards': {
+        'task': 'accounts.tasks.rebuild_leaderboards',
+        'schedule': crontab(hour='3', minute='30'),  # Daily at 3:30 AM
+    },
+    'flush-activity-log-buffer': {
+        'task': 'api.tasks.flush_activity_log_buffer',
+        'schedule': 5.0,  # Every 5 seconds (ACTIVITY_LOG_BACKEND='redis')
+    },
+    'purge-idempotency-keys': {
+        'task': 'api.tasks.purge_idempotency_keys',
+        'schedule': crontab(minute='15'),  # Hourly
+    },
 }
\ No newline at end of file
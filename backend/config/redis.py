@@ -0,0 +1,10 @@
+# backend/config/redis.py
+from functools import lru_cache
+import redis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """Zwraca współdzielonego klienta Redis (pula połączeń per proces)"""
+    return redis.Redis.from_url(settings.REDIS_URL)
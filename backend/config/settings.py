@@ -108,11 +108,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -132,8 +136,32 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Czarna lista zużytych tokenów refresh w Redis (zamiast aplikacji token_blacklist)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RotatingTokenRefreshSerializer',
 }
 
+# Cache stanu uwierzytelnienia (rola, aktywność) dla CachedJWTAuthentication, w sekundach
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+AUTH_USER_LOCAL_TTL = config('AUTH_USER_LOCAL_TTL', default=5, cast=float)
+AUTH_USER_LOCAL_MAX_ENTRIES = config('AUTH_USER_LOCAL_MAX_ENTRIES', default=10000, cast=int)
+
+# Import list klas: liczba procesów hashujących hasła (0 = liczba rdzeni)
+PROVISIONING_WORKERS = config('PROVISIONING_WORKERS', default=0, cast=int)
+# Większe listy zakłada zadanie Celery (202 + adres stanu); raport w cache przez PROVISIONING_JOB_TTL sekund
+PROVISIONING_SYNC_LIMIT = config('PROVISIONING_SYNC_LIMIT', default=10, cast=int)
+PROVISIONING_JOB_TTL = config('PROVISIONING_JOB_TTL', default=60 * 60, cast=int)
+
+# Awatary: limit przesyłanego pliku (w bajtach) i rozmiary miniatur (w pikselach)
+AVATAR_MAX_UPLOAD_SIZE = config('AVATAR_MAX_UPLOAD_SIZE', default=5 * 1024 * 1024, cast=int)
+AVATAR_SIZES = (32, 64, 128, 256)
+
+# Jak długo (w sekundach) pamiętamy odpowiedzi na żądania z nagłówkiem Idempotency-Key
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60, cast=int)
+
+# Synchronizacja postępów z aplikacji mobilnej: zakładka (w sekundach) na transakcje
+# zatwierdzone po wydaniu tokenu, ale z wcześniejszym updated_at
+SYNC_TOKEN_OVERLAP = config('SYNC_TOKEN_OVERLAP', default=5, cast=int)
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -150,14 +178,24 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Analytics
+RECOMMENDATIONS_CHUNK_SIZE = config('RECOMMENDATIONS_CHUNK_SIZE', default=5000, cast=int)
+ACTIVITY_LOG_RETENTION_DAYS = config('ACTIVITY_LOG_RETENTION_DAYS', default=90, cast=int)
+RETENTION_BATCH_SIZE = config('RETENTION_BATCH_SIZE', default=5000, cast=int)
+RETENTION_BATCH_PAUSE = config('RETENTION_BATCH_PAUSE', default=0.1, cast=float)
+
+# Activity log buffering: 'sync' (zapis w żądaniu), 'memory' (bufor w procesie), 'redis'
+ACTIVITY_LOG_BACKEND = config('ACTIVITY_LOG_BACKEND', default='memory')
+ACTIVITY_LOG_BATCH_SIZE = config('ACTIVITY_LOG_BATCH_SIZE', default=500, cast=int)
+ACTIVITY_LOG_FLUSH_INTERVAL = config('ACTIVITY_LOG_FLUSH_INTERVAL', default=2.0, cast=float)
+
 # Redis Cache
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/1')
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-        'LOCATION': config('REDIS_URL', default='redis://localhost:6379/1'),
-        'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-        },
+        'LOCATION': REDIS_URL,
         'KEY_PREFIX': 'kodkids',
         'TIMEOUT': 300,
     }
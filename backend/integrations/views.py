@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Count, Q
+from api.fast import FastListMixin
 from .models import SystemA, SystemB, IntegrationTask, IntegrationEvent, DataMapping
 from .serializers import (
     SystemASerializer, SystemBSerializer, IntegrationTaskSerializer,
@@ -130,7 +131,7 @@ class IntegrationTaskViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
-class IntegrationEventViewSet(viewsets.ReadOnlyModelViewSet):
+class IntegrationEventViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = IntegrationEvent.objects.all()
     serializer_class = IntegrationEventSerializer
     permission_classes = [IsAuthenticated]
@@ -38,4 +38,44 @@ api.interceptors.response.use(
   }
 );
 
+// Synchronizacja postępów offline - zdarzenia czekają w AsyncStorage
+// i są wysyłane jednym żądaniem zamiast wielu pojedynczych POST
+const PROGRESS_QUEUE_KEY = 'progressQueue';
+const SYNC_TOKEN_KEY = 'progressSyncToken';
+
+export const queueProgressEvent = async ({ lesson, completed = false, score = 0 }) => {
+  const queue = JSON.parse((await AsyncStorage.getItem(PROGRESS_QUEUE_KEY)) || '[]');
+  queue.push({ lesson, completed, score, client_timestamp: new Date().toISOString() });
+  await AsyncStorage.setItem(PROGRESS_QUEUE_KEY, JSON.stringify(queue));
+};
+
+// Limit serwera (MAX_SYNC_EVENTS w backend/api/views.py) - dłuższa kolejka idzie paczkami
+const SYNC_BATCH_SIZE = 1000;
+
+export const syncProgress = async () => {
+  const changes = [];
+  let batch;
+  do {
+    const queue = JSON.parse((await AsyncStorage.getItem(PROGRESS_QUEUE_KEY)) || '[]');
+    batch = queue.slice(0, SYNC_BATCH_SIZE);
+    const syncToken = await AsyncStorage.getItem(SYNC_TOKEN_KEY);
+
+    const response = await api.post('/progress/sync/', {
+      sync_token: syncToken,
+      events: batch,
+    });
+
+    // Usuwamy tylko wysłaną paczkę - nowe zdarzenia mogły dojść w trakcie żądania,
+    // a token przechodzi do kolejnej paczki
+    const current = JSON.parse((await AsyncStorage.getItem(PROGRESS_QUEUE_KEY)) || '[]');
+    await AsyncStorage.setItem(PROGRESS_QUEUE_KEY, JSON.stringify(current.slice(batch.length)));
+    await AsyncStorage.setItem(SYNC_TOKEN_KEY, response.data.sync_token);
+    changes.push(...response.data.changes);
+  } while (batch.length === SYNC_BATCH_SIZE);
+
+  // Zmiany od ostatniej synchronizacji - do scalenia po id z lokalnym stanem
+  // (późniejsza paczka nadpisuje wcześniejszą)
+  return changes;
+};
+
 export default api;
\ No newline at end of file